@@ -0,0 +1,142 @@
+"""Finished videos kept across restarts, keyed on everything that decides their content"""
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+
+ARTIFACT_DIR = os.environ.get("STICKMAN_ARTIFACT_DIR", os.path.join("media", "artifacts"))
+# Finished artifacts kept around, most recently used first
+KEEP = int(os.environ.get("STICKMAN_ARTIFACT_KEEP", "3"))
+
+# Everything a render runs; an edit to any of them changes the key. render_video.py holds
+# RENDER_CONFIG, the encoder settings and the stitching, hls_stream.py cuts the live segments
+SOURCES = (
+    "main.py", "stickman.py", "rig.py", "crowd.py", "sketch.py", "effects.py",
+    "text_cache.py", "renderer.py", "frame_queue.py", "renditions.py", "render_video.py", "hls_stream.py",
+)
+
+MANIFEST = "manifest.json"
+
+
+def library_versions():
+    """Versions of everything outside the repo that can change a frame or an encode"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {"python": platform.python_version()}
+    for package in ("manim", "numpy", "Pillow", "pycairo", "ManimPango"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    try:
+        from manim import config
+        banner = subprocess.run(
+            [config.ffmpeg_executable, "-version"], capture_output=True, text=True, check=True
+        ).stdout
+        versions["ffmpeg"] = banner.splitlines()[0] if banner else None
+    except (OSError, subprocess.CalledProcessError):
+        versions["ffmpeg"] = None
+    return versions
+
+
+def source_hashes(sources=SOURCES):
+    here = os.path.dirname(os.path.abspath(__file__))
+    hashes = {}
+    for name in sources:
+        with open(os.path.join(here, name), "rb") as f:
+            hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+def artifact_key(inputs):
+    """Key of a render from its inputs (config, seed, ...), sources and library versions
+
+    Returns (key, inputs with the sources and versions filled in).
+    """
+    inputs = {**inputs, "sources": source_hashes(), "versions": library_versions()}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:24], inputs
+
+
+def lookup(key, directory=ARTIFACT_DIR):
+    """Manifest of the finished artifact for key, None unless it is complete"""
+    path = os.path.join(directory, key)
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for output in manifest["outputs"].values():
+        try:
+            if os.path.getsize(os.path.join(path, output["file"])) != output["bytes"]:
+                return None
+        except OSError:
+            return None
+    # Mark it recently used for prune()
+    os.utime(path)
+    return manifest
+
+
+def store(key, outputs, inputs, directory=ARTIFACT_DIR):
+    """Keep the rendered {name: public path} files as the artifact for key
+
+    Files are hard-linked when possible. The artifact is assembled under a
+    private name and renamed into place with its manifest already written, so
+    lookup() never sees half of one.
+    """
+    final = os.path.join(directory, key)
+    staging = f"{final}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    manifest = {"key": key, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "inputs": inputs, "outputs": {}}
+    for name, path in outputs.items():
+        file_name = f"{name}{os.path.splitext(path)[1]}"
+        link_or_copy(path, os.path.join(staging, file_name))
+        manifest["outputs"][name] = {"path": path, "file": file_name, "bytes": os.path.getsize(path)}
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        os.rename(staging, final)
+    except OSError:
+        # Another render stored the same key first, theirs is just as good
+        shutil.rmtree(staging, ignore_errors=True)
+    prune(directory)
+    return manifest
+
+
+def restore(manifest, directory=ARTIFACT_DIR):
+    """Put every file of an artifact back at its public path, each swapped in atomically"""
+    for output in manifest["outputs"].values():
+        path = output["path"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.tmp{ext}"
+        link_or_copy(os.path.join(directory, manifest["key"], output["file"]), tmp_path)
+        os.replace(tmp_path, path)
+    return {name: output["path"] for name, output in manifest["outputs"].items()}
+
+
+def link_or_copy(source, target):
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        # Different filesystem, or no hard links there
+        shutil.copy2(source, target)
+
+
+def prune(directory=ARTIFACT_DIR, keep=KEEP):
+    """Drop all but the keep most recently used artifacts"""
+    artifacts = [
+        entry for entry in os.scandir(directory)
+        if entry.is_dir() and ".tmp-" not in entry.name
+    ]
+    artifacts.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in artifacts[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
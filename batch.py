@@ -0,0 +1,163 @@
+"""Many variants of StickmanFight rendered back to back in warm processes
+
+    python batch.py variants.json                 # one after another, in this process
+    python batch.py variants.json --workers 2     # across two long-lived worker processes
+
+variants.json is a list of POST /render parameter overrides, e.g.
+
+    [
+      {"dialogue": {"standoff_blue": "Esto termina ahora.", "standoff_yellow": "De acuerdo."}},
+      {"blue_color": "#FFA500", "yellow_color": "#4169E1"},
+      {"dialogue": {"caption": "#sketchfight"}}
+    ]
+
+Every variant ends up where POST /render would put it (media/renders/<id>.mp4),
+and one already there is skipped. manim, the fonts and the drawing caches are
+loaded once per process instead of once per video. Shaped text is shared
+across palettes through the text cache, and plays a variant does not change
+come out of the segment cache.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from render_jobs import RENDERS_DIR, normalize_params, params_hash
+
+REPORT_PATH = os.path.join("media", "batch_report.json")
+
+
+def warm_up():
+    """Import manim and the scene and load the fonts before the first variant, not during it"""
+    # manim and the scene module: most of a cold start
+    import main  # noqa: F401
+    from text_cache import cached_text
+
+    cached_text("Warm up", "#000000", 28)
+
+
+def render_one(params, output_path):
+    """Render one variant in this process, return (seconds, pid)"""
+    from render_video import render_variant
+
+    start = time.perf_counter()
+    render_variant(params, output_path)
+    return time.perf_counter() - start, os.getpid()
+
+
+def plan_batch(variants, directory=RENDERS_DIR):
+    """{id: (params, path)} of the distinct variants, ValueError naming the first bad one"""
+    if not isinstance(variants, list):
+        raise ValueError("variants must be a JSON list of parameter overrides")
+    jobs = {}
+    for i, raw in enumerate(variants):
+        try:
+            params = normalize_params(raw)
+        except ValueError as e:
+            raise ValueError(f"variant {i}: {e}")
+        job_id = params_hash(params)
+        jobs.setdefault(job_id, (params, os.path.join(directory, f"{job_id}.mp4")))
+    return jobs
+
+
+def run_batch(variants, workers=1, directory=RENDERS_DIR):
+    """Render every variant not rendered yet, return a throughput report"""
+    jobs = plan_batch(variants, directory)
+    pending = {job_id: job for job_id, job in jobs.items() if not os.path.exists(job[1])}
+    os.makedirs(directory, exist_ok=True)
+
+    renders = []
+    seen_pids = set()
+
+    def record(job_id, seconds=None, pid=None, error=None):
+        # The first variant in a process still pays for its caches, later ones show the warm cost
+        renders.append({
+            "id": job_id,
+            "path": jobs[job_id][1],
+            "seconds": None if seconds is None else round(seconds, 2),
+            "warm": pid in seen_pids,
+            "error": error,
+        })
+        seen_pids.add(pid)
+        if error is None:
+            print(f"🎬 {job_id} rendered in {seconds:.1f}s -> {jobs[job_id][1]}")
+        else:
+            print(f"❌ {job_id} failed: {error}")
+
+    start = time.perf_counter()
+    if workers <= 1 or len(pending) <= 1:
+        if pending:
+            warm_up()
+        for job_id, (params, path) in pending.items():
+            try:
+                seconds, pid = render_one(params, path)
+                record(job_id, seconds, pid)
+            except Exception as e:
+                record(job_id, error=str(e))
+    else:
+        # spawn, like the other pools: worker processes live for the whole batch
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=get_context("spawn"),
+            initializer=warm_up
+        ) as pool:
+            futures = {pool.submit(render_one, params, path): job_id for job_id, (params, path) in pending.items()}
+            for future in as_completed(futures):
+                try:
+                    seconds, pid = future.result()
+                    record(futures[future], seconds, pid)
+                except Exception as e:
+                    record(futures[future], error=str(e))
+    elapsed = time.perf_counter() - start
+
+    rendered = [render for render in renders if render["error"] is None]
+    warm = [render["seconds"] for render in rendered if render["warm"]]
+    return {
+        "variants": len(variants),
+        "distinct": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "rendered": len(rendered),
+        "failed": len(renders) - len(rendered),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 1),
+        # Start-up and warm-up included: this is what a batch really delivers
+        "videos_per_hour": round(len(rendered) / elapsed * 3600, 1) if rendered and elapsed else None,
+        "warm_seconds_per_video": round(sum(warm) / len(warm), 2) if warm else None,
+        "renders": renders,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("variants", help="JSON file with a list of parameter overrides")
+    parser.add_argument("--workers", type=int, default=1, help="warm worker processes rendering at once")
+    parser.add_argument("--report", default=REPORT_PATH, help=f"where to write the report, default {REPORT_PATH}")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    try:
+        with open(args.variants) as f:
+            variants = json.load(f)
+        report = run_batch(variants, args.workers)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    throughput = report["videos_per_hour"]
+    print(
+        f"🚀 {report['rendered']} video(s) in {report['elapsed_seconds']}s "
+        f"({report['skipped']} already rendered, {report['failed']} failed)"
+        + (f": {throughput} videos/hour" if throughput is not None else "")
+    )
+    print(f"📋 Report written to {args.report}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Benchmarks for StickmanFight: drawing helpers plus full render throughput
+
+    python benchmark.py                   # run, save media/benchmarks/latest.json
+    python benchmark.py --save-baseline   # ...and make it the baseline
+    python benchmark.py --no-render       # micro-benchmarks only
+
+Every run is compared against the baseline, if there is one; slowdowns past
+--threshold are flagged and make the exit status non-zero.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from render_video import ENCODER, RENDER_CONFIG
+
+BENCH_DIR = os.path.join("media", "benchmarks")
+
+
+def measure(fn, repeat, warmup=2):
+    """Milliseconds per call of fn over repeat calls"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "unit": "ms",
+        "median": round(statistics.median(samples), 4),
+        "min": round(min(samples), 4),
+        "runs": repeat,
+        "higher_is_better": False,
+    }
+
+
+def micro_benchmarks(repeat):
+    """Time the drawing helpers of a StickmanFight that never renders a frame"""
+    from manim import DOWN, LEFT, ORIGIN, tempconfig
+    from effects import EffectPool
+    from main import StickmanFight
+    from renderer import StickmanRenderer
+    from stickman import POSES
+    from text_cache import cached_text
+
+    results = {}
+    # A throwaway media dir: the cold text benchmarks start from an empty disk cache
+    with tempfile.TemporaryDirectory() as media_dir, tempconfig({**RENDER_CONFIG, "media_dir": media_dir}):
+        scene = StickmanFight(renderer=StickmanRenderer(defer_combine=True, skip_animations=True))
+        scene.setup()
+
+        def bench(name, fn):
+            # Effects left out of the pool by one benchmark must not weigh on the next
+            scene.effects = EffectPool()
+
+            # Same random stream for every benchmark and every run
+            def seeded():
+                scene.reseed(f"benchmark {name}")
+                fn()
+            results[name] = measure(seeded, repeat)
+
+        blue_color = StickmanFight.DEFAULT_PARAMS["blue_color"]
+        speaker = scene.draw_stickman(blue_color, LEFT * 3.5 + DOWN * 0.5)
+        for pose in POSES:
+            bench(f"draw_stickman[{pose}]", lambda: scene.draw_stickman(blue_color, ORIGIN, pose=pose))
+        bench("speech_bubble", lambda: scene.speech_bubble("This ends now.", speaker, color=blue_color))
+        bench("thought_bubble", lambda: scene.thought_bubble("...What.", speaker, color=blue_color))
+        # The two above only copy a template once warm; a line never seen before is shaped by Pango
+        lines = itertools.count()
+        bench("cached_text[cold]", lambda: cached_text(f"This ends now. {next(lines)}", blue_color, 28))
+        bench(
+            "speech_bubble[cold]",
+            lambda: scene.speech_bubble(f"This ends now. {next(lines)}", speaker, color=blue_color)
+        )
+        bench("draw_impact", lambda: scene.draw_impact(ORIGIN))
+        # Handed back every time, so every call after the first reuses the same lines
+        bench("draw_impact[pooled]", lambda: scene.retire(scene.draw_impact(ORIGIN)))
+        bench("draw_dust", lambda: scene.draw_dust(LEFT * 2))
+
+        # One cheering frame of an instanced crowd, posed and rasterized; should grow sub-linearly
+        camera = scene.renderer.camera
+        for size in (50, 200, 800):
+            scene.reseed(f"benchmark crowd[{size}]")
+            crowd = scene.draw_crowd(size, [blue_color, StickmanFight.DEFAULT_PARAMS["yellow_color"]])
+            crowd.start_cheering()
+
+            def crowd_frame():
+                crowd.react(crowd, 1 / RENDER_CONFIG["frame_rate"])
+                camera.reset()
+                camera.capture_mobjects([crowd])
+            bench(f"crowd[{size}]", crowd_frame)
+    return results
+
+
+def render_benchmark():
+    """Frames per second of a full, uncached StickmanFight render at the production config"""
+    from manim import tempconfig
+    from main import StickmanFight
+    from renderer import StickmanRenderer
+
+    with tempfile.TemporaryDirectory() as partial_movie_dir:
+        # Caching off, so every animation is really rasterized and encoded
+        with tempconfig({**RENDER_CONFIG, "disable_caching": True, "partial_movie_dir": partial_movie_dir}):
+            scene = StickmanFight(renderer=StickmanRenderer(defer_combine=True, encoder=ENCODER))
+            start = time.perf_counter()
+            scene.render()
+            elapsed = time.perf_counter() - start
+
+    frames = scene.renderer.frames_written
+    return {
+        "render_fps": {
+            "unit": "frames/s",
+            "median": round(frames / elapsed, 3),
+            "frames": frames,
+            "seconds": round(elapsed, 3),
+            "resolution": f"{RENDER_CONFIG['pixel_width']}x{RENDER_CONFIG['pixel_height']}",
+            "frame_rate": RENDER_CONFIG["frame_rate"],
+            "encoder": ENCODER,
+            "higher_is_better": True,
+        }
+    }
+
+
+def compare(results, baseline, threshold):
+    """Names of the benchmarks that got more than threshold slower than baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or not before["median"]:
+            continue
+        change = result["median"] / before["median"] - 1
+        if result["higher_is_better"]:
+            change = -change
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  <-- REGRESSION"
+        print(f"  {name:<28}{before['median']:>11.3f} -> {result['median']:>11.3f} {result['unit']:<9}"
+              f"{change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="timed calls per micro-benchmark")
+    parser.add_argument("--no-render", action="store_true", help="skip the end-to-end render")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    from manim import __version__ as manim_version
+    from main import StickmanFight
+
+    results = micro_benchmarks(args.repeat)
+    if not args.no_render:
+        results.update(render_benchmark())
+
+    run = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "manim": manim_version,
+            "machine": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": StickmanFight.seed,
+        },
+        "results": results,
+    }
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(run, f, indent=2)
+    print(f"📊 Results written to {args.output}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        for name, result in results.items():
+            print(f"  {name:<28}{result['median']:>11.3f} {result['unit']}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"📏 Compared with {args.baseline} ({baseline['meta']['timestamp']}), + is slower:")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) past {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Instanced crowds: hundreds of stickmen drawn as a handful of VMobjects"""
+import numpy as np
+from manim import Circle, VGroup, VMobject
+
+from rig import BONE, BONES, HEAD_RADIUS, LIMBS, PARENTS, forward_kinematics, pose_arrays, segment_points, wrap_angles
+from stickman import HIP
+
+# Where each bone starts among the joints: the hip, then every bone's end
+JOINT_OF_START = np.array(PARENTS) + 1
+
+# Both arms thrown up, the pose a cheering spectator swings towards
+CHEER_REACH = ((-0.45, 0.75), (0.45, 0.75))
+
+# One unit circle outline shared by every head
+HEAD_OUTLINE = Circle(radius=1).points[:, :2]
+HEAD_POINTS = len(HEAD_OUTLINE)
+# Head outline plus one body segment, then two two-segment limbs per arm/leg
+BOLD_POINTS = HEAD_POINTS + 4
+LIMB_POINTS = len(LIMBS) * 8
+
+
+def cheer_arrays(base="neutral"):
+    """(angles, lengths) of the base pose with both arms raised"""
+    angles, lengths = pose_arrays(base)
+    for (upper, forearm), (x, y) in zip(LIMBS[:2], CHEER_REACH):
+        angles[upper] = np.arctan2(y, x) - np.pi / 2
+        angles[forearm] = 0
+        lengths[upper] = lengths[forearm] = np.hypot(x, y) / 2
+    return angles, lengths
+
+
+def stadium_layout(count, rows=5, width=12.0, front=-3.0, depth=2.5, rng=None):
+    """(positions, scales) for count spectators in rows that shrink towards the back"""
+    per_row = int(np.ceil(count / rows))
+    row = np.arange(count) // per_row
+    seat = np.arange(count) % per_row
+    scales = 0.55 * 0.85 ** row
+    x = (seat - (per_row - 1) / 2) * width / per_row + (row % 2) * width / per_row / 2
+    y = front + row * depth / rows
+    positions = np.stack([x, y], axis=1)
+    if rng is not None:
+        # Nobody sits perfectly in line
+        positions += rng.uniform(-0.05, 0.05, positions.shape)
+    return positions, scales
+
+
+class Crowd(VGroup):
+    """Stickmen sharing one skeleton, with per-instance position, scale, color and phase
+
+    Every instance of a color lives in the same two VMobjects (heads and
+    bodies, then limbs), so cairo strokes a whole crowd with two calls per
+    color no matter how many people are in it. Poses for all instances come
+    from one batched forward_kinematics call and are written in place.
+    """
+
+    def __init__(self, positions, colors, scales=None, phases=None, pose="neutral",
+                 stroke_width=4, wiggle=0.02, rng=None, **kwargs):
+        self.positions = np.asarray(positions, dtype=float)[:, :2]
+        count = len(self.positions)
+        self.scales = np.ones(count) if scales is None else np.asarray(scales, dtype=float)
+        if phases is None:
+            phases = rng.uniform(0, 2 * np.pi, count) if rng is not None else np.zeros(count)
+        self.phases = np.asarray(phases, dtype=float)
+
+        self.rest = pose_arrays(pose)
+        self.cheer = cheer_arrays(pose)
+        self.excitement = 0.0
+        self.rate = 1.5
+        self.time = 0.0
+
+        # One pair of VMobjects per color, holding that color's instances
+        colors = np.asarray(colors)
+        self.groups = []
+        parts = []
+        for color in dict.fromkeys(colors.tolist()):
+            members = np.flatnonzero(colors == color)
+            bold = VMobject(color=color, stroke_width=stroke_width)
+            bold.set_points(np.zeros((len(members) * BOLD_POINTS, 3)))
+            limbs = VMobject(color=color, stroke_width=max(stroke_width - 1, 1))
+            limbs.set_points(np.zeros((len(members) * LIMB_POINTS, 3)))
+            self.groups.append((members, bold, limbs))
+            parts += [bold, limbs]
+        super().__init__(*parts, **kwargs)
+
+        self.wiggle = np.zeros((count, len(BONES) + 1, 2))
+        if rng is not None:
+            self.wiggle = rng.uniform(-wiggle, wiggle, self.wiggle.shape) * self.scales[:, None, None]
+        self.pose_instances()
+
+    def pose_instances(self):
+        """Run forward kinematics for every instance and write the points in place"""
+        reaction = self.excitement * (0.5 + 0.5 * np.sin(2 * np.pi * self.rate * self.time + self.phases))
+        (rest_angles, rest_lengths), (cheer_angles, cheer_lengths) = self.rest, self.cheer
+        angles = rest_angles + np.outer(reaction, wrap_angles(cheer_angles - rest_angles))
+        lengths = (rest_lengths + np.outer(reaction, cheer_lengths - rest_lengths)) * self.scales[:, None]
+        # Cheering spectators bounce a little too
+        roots = self.positions + HIP[:2] * self.scales[:, None]
+        roots[:, 1] += 0.1 * reaction * self.scales
+
+        _, ends = forward_kinematics(roots, angles, lengths)
+        # Wiggle the joints (hip first) rather than the bones, so limbs stay connected
+        joints = np.concatenate([roots[:, None], ends], axis=1)
+        joints += self.wiggle
+        starts = joints[:, JOINT_OF_START]
+        ends = joints[:, 1:]
+
+        for members, bold, limbs in self.groups:
+            s, e, scale = starts[members], ends[members], self.scales[members]
+            bold_points = bold.points.reshape(len(members), BOLD_POINTS, 3)
+            bold_points[:, :HEAD_POINTS, :2] = (
+                HEAD_OUTLINE * (HEAD_RADIUS * scale)[:, None, None] + e[:, None, BONE["head"]]
+            )
+            bold_points[:, HEAD_POINTS:] = segment_points(s[:, BONE["spine"]], e[:, BONE["neck"]])
+
+            limb_points = limbs.points.reshape(len(members), len(LIMBS), 8, 3)
+            for i, (first, second) in enumerate(LIMBS):
+                limb_points[:, i, :4] = segment_points(s[:, first], e[:, first])
+                limb_points[:, i, 4:] = segment_points(s[:, second], e[:, second])
+        return self
+
+    def react(self, mobject, dt):
+        """Updater: advance every instance along its own cheer cycle"""
+        self.time += dt
+        self.pose_instances()
+
+    def start_cheering(self, excitement=1.0, rate=1.5):
+        """Swing arms up and down, each spectator at their own phase"""
+        self.excitement = excitement
+        self.rate = rate
+        if self.react not in self.get_updaters():
+            self.add_updater(self.react)
+        return self
+
+    def settle(self):
+        """Back to the resting pose, static again (e.g. for the static layer)"""
+        self.remove_updater(self.react)
+        self.excitement = 0.0
+        return self.pose_instances()
@@ -0,0 +1,81 @@
+"""Pool of transient effect mobjects (arrows, impact and motion lines), re-posed instead of rebuilt"""
+
+# VMobject attributes an animation may leave changed on an effect (FadeOut, Create, ...)
+STYLE_ATTRS = ("fill_rgbas", "stroke_rgbas", "background_stroke_rgbas", "stroke_width")
+
+
+class EffectPool:
+    """Hands out effects, taking back the ones released and resetting them for the next caller
+
+    Each effect is built once per free slot by build(*args) and pooled under
+    (build name, *args). A snapshot of every family member's points and style
+    is taken when it is built and copied back over it when it is handed out
+    again. Attributes a use left behind (the target of .animate, a
+    saved_state) are dropped, so a reused effect is indistinguishable from a
+    fresh one - and hashes the same for the segment cache.
+    """
+
+    def __init__(self):
+        self.free = {}
+        # id(effect) -> (key, effect, snapshot); holds on to every effect ever built
+        self.pooled = {}
+        self.built = 0
+        self.reused = 0
+
+    def acquire(self, build, *args):
+        key = (build.__name__, *args)
+        idle = self.free.get(key)
+        if idle:
+            mobject = idle.pop()
+            restore(self.pooled[id(mobject)][2])
+            self.reused += 1
+            return mobject
+        mobject = build(*args)
+        self.pooled[id(mobject)] = (key, mobject, snapshot(mobject))
+        self.built += 1
+        return mobject
+
+    def release(self, *mobjects):
+        """Take effects back; anything that did not come from acquire() is ignored"""
+        for mobject in mobjects:
+            entry = self.pooled.get(id(mobject))
+            if entry is None:
+                continue
+            idle = self.free.setdefault(entry[0], [])
+            if all(other is not mobject for other in idle):
+                mobject.clear_updaters()
+                idle.append(mobject)
+
+    def stats(self):
+        return {
+            "built": self.built,
+            "reused": self.reused,
+            "idle": sum(len(idle) for idle in self.free.values()),
+        }
+
+
+def snapshot(mobject):
+    return [
+        (member, member.points.copy(), {
+            name: copy_value(getattr(member, name)) for name in STYLE_ATTRS if hasattr(member, name)
+        }, set(vars(member)))
+        for member in mobject.get_family()
+    ]
+
+
+def restore(members):
+    for member, points, style, attributes in members:
+        for name in set(vars(member)) - attributes:
+            delattr(member, name)
+        if member.points.shape == points.shape:
+            # Same buffer, no new allocation per shot
+            member.points[:] = points
+        else:
+            member.points = points.copy()
+        for name, value in style.items():
+            setattr(member, name, copy_value(value))
+
+
+def copy_value(value):
+    # Arrays are copied, plain numbers like stroke_width are immutable anyway
+    return value.copy() if hasattr(value, "copy") else value
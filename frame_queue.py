@@ -0,0 +1,72 @@
+"""Frames handed to the encoder from a writer thread, so rasterizing never waits on ffmpeg"""
+import os
+import queue
+import threading
+
+import numpy as np
+
+# Frames that may wait for the encoder thread before rasterizing blocks; 2 double-buffers
+FRAME_BUFFERS = int(os.environ.get("STICKMAN_FRAME_BUFFERS", "2"))
+
+
+class FrameQueue:
+    """Feeds frames to an ffmpeg pipe from a writer thread, through a few reused buffers
+
+    put() copies the frame into a free buffer and returns straight away, so
+    the next frame is rasterized while ffmpeg takes this one. It only blocks
+    when every buffer is still waiting, i.e. when the encoder is the bottleneck.
+    """
+
+    def __init__(self, buffers=FRAME_BUFFERS):
+        self.buffers = max(buffers, 1)
+        self.free = queue.Queue()
+        self.allocated = 0
+        self.frames = None
+        self.thread = None
+        self.error = None
+
+    @property
+    def is_open(self):
+        return self.thread is not None
+
+    def open(self, stream):
+        self.frames = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self.drain, args=(stream, self.frames), daemon=True)
+        self.thread.start()
+
+    def put(self, frame, repeat=1):
+        if self.error is not None:
+            raise self.error
+        if self.free.empty() and self.allocated < self.buffers:
+            self.allocated += 1
+            buffer = np.empty_like(frame)
+        else:
+            buffer = self.free.get()
+            if buffer.shape != frame.shape or buffer.dtype != frame.dtype:
+                buffer = np.empty_like(frame)
+        np.copyto(buffer, frame)
+        self.frames.put((buffer, repeat))
+
+    def drain(self, stream, frames):
+        while True:
+            item = frames.get()
+            if item is None:
+                return
+            buffer, repeat = item
+            try:
+                if self.error is None:
+                    for _ in range(repeat):
+                        stream.write(buffer)
+            except OSError as e:
+                # ffmpeg went away; keep handing buffers back so put() never hangs
+                self.error = e
+            finally:
+                self.free.put(buffer)
+
+    def close(self):
+        """Wait for every queued frame to reach the pipe, return the write error if any"""
+        self.frames.put(None)
+        self.thread.join()
+        self.thread = None
+        return self.error
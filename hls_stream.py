@@ -0,0 +1,94 @@
+"""Live HLS playlist of a render in progress, growing by one finished section at a time"""
+import os
+import shutil
+import subprocess
+import threading
+
+HLS_DIR = os.path.join("media", "hls")
+PLAYLIST_NAME = "stickman_fight.m3u8"
+# ffmpeg cuts each section into segments of about this long, at keyframes
+SEGMENT_SECONDS = 2
+
+
+class HlsStream:
+    """EVENT playlist that sections are appended to in play order, whatever order they finish in
+
+    Every section's partial movies are remuxed (no re-encode) into MPEG-TS
+    segments, with their timestamps moved on by -output_ts_offset so the
+    stream plays on without a discontinuity.
+    """
+
+    def __init__(self, order, directory=HLS_DIR):
+        self.order = list(order)
+        self.directory = directory
+        self.playlist = os.path.join(directory, PLAYLIST_NAME)
+        self.pending = {}
+        self.next = 0
+        self.offset = 0.0
+        self.lock = threading.Lock()
+        # A playlist left over from the last render would be appended to
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    @property
+    def url(self):
+        return "/" + self.playlist.replace(os.sep, "/")
+
+    @property
+    def started(self):
+        return os.path.exists(self.playlist)
+
+    def add(self, section, partial_movies):
+        """A section finished; publish it and any later ones that were waiting for it"""
+        with self.lock:
+            if section not in self.order:
+                return
+            self.pending[section] = partial_movies
+            while self.next < len(self.order) and self.order[self.next] in self.pending:
+                movies = self.pending.pop(self.order[self.next])
+                self.next += 1
+                if movies:
+                    self.append(movies)
+
+    def append(self, partial_movies):
+        from manim import config
+
+        list_path = os.path.join(self.directory, "section.txt")
+        with open(list_path, "w") as f:
+            for path in partial_movies:
+                f.write(f"file 'file:{os.path.abspath(path)}'\n")
+        subprocess.run(
+            [
+                config.ffmpeg_executable, "-y", "-nostdin", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-c", "copy", "-an", "-output_ts_offset", f"{self.offset:.6f}",
+                "-f", "hls", "-hls_time", str(SEGMENT_SECONDS), "-hls_playlist_type", "event",
+                # Keep the segments already listed, leave the playlist open for the next section
+                "-hls_flags", "append_list+omit_endlist+temp_file",
+                "-hls_segment_filename", os.path.join(self.directory, "segment_%05d.ts"),
+                self.playlist,
+            ],
+            check=True
+        )
+        os.remove(list_path)
+        self.offset += sum(movie_duration(path) for path in partial_movies)
+
+    def finish(self):
+        """Mark the playlist complete, so players stop polling it"""
+        with self.lock:
+            if self.started:
+                with open(self.playlist, "a") as f:
+                    f.write("#EXT-X-ENDLIST\n")
+
+
+def movie_duration(path):
+    """Seconds of video in a partial movie, from ffprobe next to manim's ffmpeg"""
+    from manim import config
+
+    ffmpeg = config.ffmpeg_executable
+    ffprobe = os.path.join(os.path.dirname(ffmpeg), "ffprobe") if os.path.dirname(ffmpeg) else "ffprobe"
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
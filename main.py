@@ -1,32 +1,200 @@
 from manim import *
+from manim.utils.exceptions import EndSceneEarlyException
+from manim.utils.family import extract_mobject_family_members
 import numpy as np
-import random
+import zlib
+from tqdm import tqdm
+
+from crowd import Crowd, stadium_layout
+from effects import EffectPool
+from renderer import StickmanRenderer
+from rig import Repose, StickmanRig, Walk
+from sketch import Boil, jitter, make_rng
+from stickman import pose_template
+from text_cache import cached_text
 
 class StickmanFight(Scene):
+    # Seed for every random wiggle, so re-renders come out identical
+    seed = 0
+
+    # Independently renderable chunks of construct(), in play order
+    SECTIONS = (
+        "standoff",
+        "first shot",
+        "rapid fire",
+        "final stance",
+        "suction arrow",
+        "thwip",
+        "defeat",
+        "acceptance",
+        "title card",
+        "selfie",
+    )
+
+    # Everything a render request may override, see render_jobs.normalize_params
+    DEFAULT_PARAMS = {
+        "blue_color": "#4169E1",  # Royal blue
+        "yellow_color": "#FFA500",  # Orange
+        "fps": 16,
+        "width": 720,
+        "height": 1280,
+        "dialogue": {
+            "standoff_blue": "This ends now.",
+            "standoff_yellow": "Agreed.",
+            "first_shot_blue": "Too slow.",
+            "rapid_fire_yellow": "...Okay.",
+            "final_stance_blue": "Any last words?",
+            "suction_arrow_yellow": "One.",
+            "thwip_blue": "...What.",
+            "defeat_yellow": "Suction cup.\nNon-lethal.\nVery effective.",
+            "acceptance_blue": "...I can work with this.",
+            "title": "NEW AESTHETIC UNLOCKED",
+            "caption": "#newaesthetic #worthit",
+        },
+    }
+
+    def __init__(self, renderer=None, camera_class=Camera, skip_animations=False, sections=None,
+                 progress=None, params=None, **kwargs):
+        # Colors, dialogue and fps of this variant, on top of DEFAULT_PARAMS
+        self.params = {**self.DEFAULT_PARAMS, **(params or {})}
+        self.params["dialogue"] = {**self.DEFAULT_PARAMS["dialogue"], **self.params["dialogue"]}
+        # Only these sections get rasterized, the others are fast-forwarded
+        self.sections = sections
+        # Called with (animations, frames) after every play that was rendered
+        self.progress = progress
+        if renderer is None:
+            renderer = StickmanRenderer(camera_class=camera_class, skip_animations=skip_animations)
+        super().__init__(
+            renderer=renderer,
+            camera_class=camera_class,
+            skip_animations=skip_animations,
+            **kwargs
+        )
+
+    def setup(self):
+        self.sections_begun = set()
+        self.static_layer = []
+        # Arrows, impact and motion lines are reused shot after shot, see retire()
+        self.effects = EffectPool()
+        self.reseed("setup")
+
+    def mark_static(self, *mobjects):
+        """Rasterize these once into the background layer instead of on every frame
+
+        The layer sits beneath everything else, so only marked mobjects at the
+        bottom of the draw order go into it: one with an unmarked mobject
+        beneath it, or that gets animated or has an updater, is drawn normally
+        for that play, in its place.
+        """
+        self.static_layer.extend(mobjects)
+
+    def static_layer_mobjects(self):
+        """Marked mobjects that are really static during this play, with nothing else below them"""
+        animated = {animation.mobject for animation in self.animations or []}
+        order = self.mobjects
+        if self.renderer.camera.use_z_index:
+            # Same stable sort the camera draws in
+            order = sorted(order, key=lambda mobject: mobject.z_index)
+        layer = []
+        for mobject in order:
+            if (
+                mobject not in self.static_layer
+                or mobject in animated
+                or mobject.get_family_updaters()
+            ):
+                break
+            layer.append(mobject)
+        return layer
+
+    def get_moving_mobjects(self, *animations):
+        # manim treats everything after the first moving mobject as moving too,
+        # the static layer is already in the background either way
+        layer = set(extract_mobject_family_members(self.static_layer_mobjects()))
+        return [mobject for mobject in super().get_moving_mobjects(*animations) if mobject not in layer]
+
+    def retire(self, *mobjects):
+        """Take effects off screen and hand them back to the pool for the next shot"""
+        self.remove(*mobjects)
+        self.effects.release(*mobjects)
+    
+    def begin_section(self, name):
+        """Start one of SECTIONS, fast-forwarding through it unless it was asked for"""
+        if self.sections is not None and self.sections_begun.issuperset(self.sections):
+            # Everything asked for is rendered, no need to play the rest
+            raise EndSceneEarlyException()
+        self.sections_begun.add(name)
+        self.next_section(name, skip_animations=self.sections is not None and name not in self.sections)
+        self.reseed(name)
+
+    def reseed(self, section):
+        """Start a section's own wiggle stream, so edits elsewhere never reshuffle it"""
+        self.section = section
+        self.section_plays = 0
+        self.rng = make_rng(self.seed, section)
+
+    def play(self, *args, **kwargs):
+        # Every play draws from its own stream too: skipping a cached play
+        # must not shift the wiggle of the ones after it
+        self.rng = make_rng(self.seed, self.section, self.section_plays)
+        # Where the frame grid falls decides which frames a play has, so it is part of the key
+        self.cache_salt = (
+            f"{self.seed}-{zlib.crc32(self.section.encode()):08x}-{self.section_plays}"
+            f"-{self.renderer.grid_offset() * 1000:.0f}"
+        )
+        self.section_plays += 1
+        
+        frames_before = self.renderer.frames_written
+        super().play(*args, **kwargs)
+        frames = self.renderer.frames_written - frames_before
+        
+        rendered = not self.renderer.file_writer.sections[-1].skip_animations
+        if self.progress is not None and rendered:
+            self.progress(1, frames)
+        
+        profile = self.renderer.profile
+        if profile is not None:
+            if rendered:
+                # Still skipping after the play means its partial movie was cached
+                profile.record(self, self.section_plays - 1, frames, cached=self.renderer.skip_animations)
+            else:
+                profile.skip()
+
+    def get_time_progression(self, run_time, description, n_iterations=None, override_skip_animations=False):
+        if self.renderer.skip_animations and not override_skip_animations:
+            return super().get_time_progression(run_time, description, n_iterations, override_skip_animations)
+        # Frames on the whole video's 1/fps grid, see StickmanRenderer.frame_times
+        return tqdm(
+            self.renderer.frame_times(run_time),
+            desc=description,
+            total=n_iterations,
+            leave=config["progress_bar"] == "leave",
+            disable=config["progress_bar"] == "none"
+        )
+
     def construct(self):
-        # 16 FPS for that smooth TikTok/YouTube feel
-        self.camera.frame_rate = 16
+        # 16 FPS by default for that smooth TikTok/YouTube feel (variant_config sets it),
+        # drafts may sample fewer frames of the same timeline
+        self.camera.frame_rate = config.frame_rate
         self.camera.background_color = "#F0F0F0"  # Paper white background
         
-        # ---------- HAND-DRAWN STYLE SETTINGS ----------
-        # Slight wiggle for that "drawn" feel
-        wiggle = 0.02
+        blue_color = self.params["blue_color"]
+        yellow_color = self.params["yellow_color"]
+        dialogue = self.params["dialogue"]
         
         # ---------- SCENE 1: STANDOFF ----------
-        # Create Blue - confident stance
-        blue = self.draw_stickman(
-            color="#4169E1",  # Royal blue
+        self.begin_section("standoff")
+        # Create Blue - confident stance (rigged, so limbs can move later)
+        blue = self.draw_rig(
+            color=blue_color,
             position=LEFT * 3.5 + DOWN * 0.5,
-            pose="ready",
-            name="Blue"
+            pose="ready"
         )
         
         # Create Yellow - calm, ready
-        yellow = self.draw_stickman(
-            color="#FFA500",  # Orange
+        yellow = self.draw_rig(
+            color=yellow_color,
             position=RIGHT * 3.5 + DOWN * 0.5,
-            pose="calm",
-            name="Yellow"
+            pose="calm"
         )
         
         # Ground line
@@ -36,8 +204,9 @@ class StickmanFight(Scene):
         # Dust/sketch marks
         dust = self.draw_dust(LEFT * 2)
         
-        # Add everything
+        # Add everything - ground and dust never move, draw them just once
         self.add(ground, dust, blue, yellow)
+        self.mark_static(ground, dust)
         self.wait(0.5)
         
         # Blue ignites light stick - ACTION LINE!
@@ -49,26 +218,27 @@ class StickmanFight(Scene):
         
         # Dialogue with hand-drawn bubbles
         blue_text = self.speech_bubble(
-            "This ends now.", 
+            dialogue["standoff_blue"], 
             blue, 
-            color="#4169E1"
+            color=blue_color
         )
         self.play(Write(blue_text), run_time=0.5)
         self.wait(0.8)
         self.remove(blue_text)
         
         yellow_text = self.speech_bubble(
-            "Agreed.", 
+            dialogue["standoff_yellow"], 
             yellow,
-            color="#FFA500"
+            color=yellow_color
         )
         self.play(Write(yellow_text), run_time=0.4)
         self.wait(0.5)
         self.remove(yellow_text)
         
         # ---------- SCENE 2: FIRST SHOT ----------
+        self.begin_section("first shot")
         # Yellow draws arrow
-        arrow = self.draw_arrow(color="#FFA500")
+        arrow = self.draw_arrow(color=yellow_color)
         arrow.move_to(yellow.get_center() + RIGHT * 0.8 + UP * 0.3)
         self.add(arrow)
         
@@ -86,25 +256,26 @@ class StickmanFight(Scene):
             Create(impact),
             run_time=0.1
         )
-        self.remove(impact)
+        self.retire(arrow, impact)
         
-        blue_text = self.thought_bubble("Too slow.", blue, color="#4169E1")
+        blue_text = self.thought_bubble(dialogue["first_shot_blue"], blue, color=blue_color)
         self.play(Write(blue_text), run_time=0.3)
         self.wait(0.3)
         self.remove(blue_text)
         
         # ---------- SCENE 3: RAPID FIRE + CHARGE ----------
+        self.begin_section("rapid fire")
         # Blue charges - RUNNING LINES!
         run_lines = self.draw_motion_lines(blue, direction=RIGHT)
         self.play(
             blue.animate.move_to(RIGHT * 0.5 + DOWN * 0.5),
             run_time=0.4
         )
-        self.remove(run_lines)
+        self.retire(run_lines)
         
         # Three arrows rapid fire
         for i in range(3):
-            arrow = self.draw_arrow(color="#FFA500")
+            arrow = self.draw_arrow(color=yellow_color)
             arrow.move_to(yellow.get_center() + RIGHT * 0.8 + UP * (0.2 + i * 0.15))
             self.add(arrow)
             
@@ -120,7 +291,7 @@ class StickmanFight(Scene):
                 Create(impact),
                 run_time=0.08
             )
-            self.remove(impact)
+            self.retire(arrow, impact)
         
         # Yellow steps back - SURPRISE!
         self.play(
@@ -128,12 +299,13 @@ class StickmanFight(Scene):
             run_time=0.15
         )
         
-        yellow_text = self.thought_bubble("...Okay.", yellow, color="#FFA500")
+        yellow_text = self.thought_bubble(dialogue["rapid_fire_yellow"], yellow, color=yellow_color)
         self.play(Write(yellow_text), run_time=0.2)
         self.wait(0.3)
         self.remove(yellow_text)
         
         # ---------- SCENE 4: FINAL STANCE ----------
+        self.begin_section("final stance")
         # Blue raises weapon - DRAMATIC!
         self.play(
             blue.animate.shift(UP * 0.2),
@@ -141,12 +313,13 @@ class StickmanFight(Scene):
             run_time=0.3
         )
         
-        blue_text = self.speech_bubble("Any last words?", blue, color="#4169E1")
+        blue_text = self.speech_bubble(dialogue["final_stance_blue"], blue, color=blue_color)
         self.play(Write(blue_text), run_time=0.4)
         self.wait(0.5)
         self.remove(blue_text)
         
         # ---------- SCENE 5: THE SUCTION ARROW ----------
+        self.begin_section("suction arrow")
         # Yellow reaches back SLOWLY
         self.play(
             yellow.animate.rotate(-10 * DEGREES, about_point=yellow.get_center()),
@@ -161,12 +334,13 @@ class StickmanFight(Scene):
             run_time=0.2
         )
         
-        yellow_text = self.speech_bubble("One.", yellow, color="#FFA500", bold=True)
+        yellow_text = self.speech_bubble(dialogue["suction_arrow_yellow"], yellow, color=yellow_color, bold=True)
         self.play(Write(yellow_text), run_time=0.3)
         self.wait(0.4)
         self.remove(yellow_text)
         
         # ---------- SCENE 6: THWIP! ----------
+        self.begin_section("thwip")
         # Fire - but different sound/feel
         self.play(
             suction_arrow.animate.move_to(blue.get_top() + UP * 0.3),
@@ -181,7 +355,7 @@ class StickmanFight(Scene):
         )
         
         # Blue confusion
-        blue_text = self.thought_bubble("...What.", blue, color="#4169E1")
+        blue_text = self.thought_bubble(dialogue["thwip_blue"], blue, color=blue_color)
         self.play(Write(blue_text), run_time=0.2)
         self.wait(0.4)
         self.remove(blue_text)
@@ -200,6 +374,7 @@ class StickmanFight(Scene):
             )
         
         # ---------- SCENE 7: DEFEAT ----------
+        self.begin_section("defeat")
         # Drop light stick - *clatter*
         self.play(
             light_stick.animate.scale(0.5).shift(DOWN * 0.5),
@@ -207,20 +382,20 @@ class StickmanFight(Scene):
             run_time=0.2
         )
         
-        # Yellow walks away - COOL!
+        # Yellow walks away - COOL! A real walk cycle, legs and all
         walk_lines = self.draw_motion_lines(yellow, direction=RIGHT)
         self.play(
-            yellow.animate.move_to(RIGHT * 6 + DOWN * 0.5),
+            Walk(yellow, RIGHT * 6 + DOWN * 0.5 - yellow.get_center(), strides=4, base="calm", rate_func=linear),
             walk_lines.animate.move_to(RIGHT * 6 + DOWN * 0.5),
             run_time=1
         )
-        self.remove(walk_lines)
+        self.retire(walk_lines)
         
         # Victory speech
         yellow_text = self.speech_bubble(
-            "Suction cup.\nNon-lethal.\nVery effective.", 
+            dialogue["defeat_yellow"], 
             yellow, 
-            color="#FFA500",
+            color=yellow_color,
             font_size=24
         )
         self.play(Write(yellow_text), run_time=0.8)
@@ -228,6 +403,7 @@ class StickmanFight(Scene):
         self.remove(yellow_text)
         
         # ---------- SCENE 8: ACCEPTANCE ----------
+        self.begin_section("acceptance")
         # Blue alone - defeated pose
         self.play(
             blue.animate.shift(DOWN * 0.1),
@@ -246,18 +422,19 @@ class StickmanFight(Scene):
         )
         
         # ACCEPTANCE - character growth!
-        blue_text = self.thought_bubble("...I can work with this.", blue, color="#4169E1")
+        blue_text = self.thought_bubble(dialogue["acceptance_blue"], blue, color=blue_color)
         self.play(Write(blue_text), run_time=0.5)
         self.wait(0.8)
         self.remove(blue_text)
         
         # ---------- FINAL FRAME ----------
+        self.begin_section("title card")
         self.clear()
         
         # Title card - COMIC STYLE!
-        title = Text(
-            "NEW AESTHETIC UNLOCKED",
-            color="#4169E1",
+        title = cached_text(
+            dialogue["title"],
+            color=blue_color,
             font_size=48,
             weight=BOLD,
             font="Comic Sans MS"
@@ -268,26 +445,22 @@ class StickmanFight(Scene):
         underline = Line(
             title.get_left() + DOWN * 0.3,
             title.get_right() + DOWN * 0.3,
-            color="#FFA500",
+            color=yellow_color,
             stroke_width=8
         )
-        underline.add_updater(lambda x: x.become(
-            Line(
-                title.get_left() + DOWN * 0.3 + LEFT * random.uniform(-0.02, 0.02),
-                title.get_right() + DOWN * 0.3 + RIGHT * random.uniform(-0.02, 0.02),
-                color="#FFA500",
-                stroke_width=8
-            )
-        ))
         
         self.play(
             Write(title),
             Create(underline),
             run_time=0.8
         )
+        # Boils on twos, wobbling sideways in place instead of a new Line per frame. Only once
+        # drawn: Create rewrites the points every frame, under the noise Boil thinks is there
+        underline.add_updater(Boil(RIGHT * 0.02, self.seed, "underline", fps=self.params["fps"], every=2))
         self.wait(1)
         
         # ---------- BONUS: SELFIE ----------
+        self.begin_section("selfie")
         self.clear()
         
         # Simple phone frame
@@ -302,7 +475,7 @@ class StickmanFight(Scene):
         
         # Blue with arrow still on head - COMMITMENT TO THE BIT
         blue_selfie = self.draw_stickman(
-            color="#4169E1",
+            color=blue_color,
             position=ORIGIN + DOWN * 0.5,
             pose="selfie"
         )
@@ -315,127 +488,47 @@ class StickmanFight(Scene):
             Line(ORIGIN + RIGHT * 0.2 + UP * 0.3, ORIGIN + RIGHT * 0.2 + UP * 0.6),
             Line(ORIGIN + RIGHT * 0.4 + UP * 0.3, ORIGIN + RIGHT * 0.4 + UP * 0.6),
         )
-        peace.set_color("#4169E1")
+        peace.set_color(blue_color)
         peace.move_to(blue_selfie.get_center() + RIGHT * 0.5 + UP * 0.2)
         
         # Caption
-        caption = Text(
-            "#newaesthetic #worthit",
+        caption = cached_text(
+            dialogue["caption"],
             color="#666666",
             font_size=20,
             font="Comic Sans MS"
         )
         caption.next_to(phone, DOWN, buff=0.3)
         
-        self.add(phone, blue_selfie, arrow_selfie, peace, caption)
+        # The caption sits clear of the phone, so it can go beneath the selfie in the static layer
+        self.add(phone, caption, blue_selfie, arrow_selfie, peace)
+        self.mark_static(phone, caption)
         self.wait(1.5)
     
-    def draw_stickman(self, color, position, pose="neutral", name=""):
+    def draw_stickman(self, color, position, pose="neutral", name="", wiggle=0.02, stroke_width=6):
         """Draw a proper HAND-DRAWN style stickman"""
-        group = VGroup()
-        
-        # Slight random offset for hand-drawn feel
-        wiggle = 0.02
-        
-        # Head - slightly imperfect circle
-        head = Circle(
-            radius=0.28,
-            color=color,
-            stroke_width=6
-        )
-        head.move_to(position + UP * 1.2)
-        head.apply_function(
-            lambda p: p + np.array([random.uniform(-wiggle, wiggle) for _ in range(3)])
-        )
-        
-        # Body - slightly wobbly line
-        body = Line(
-            position + UP * 0.9,
-            position + DOWN * 0.3,
-            color=color,
-            stroke_width=6
-        )
-        body.apply_function(
-            lambda p: p + np.array([random.uniform(-wiggle, wiggle) for _ in range(3)])
-        )
-        
-        # Arms based on pose
-        if pose == "ready":  # Blue fighting stance
-            left_arm = Line(
-                position + UP * 0.7,
-                position + LEFT * 0.6 + UP * 0.4,
-                color=color,
-                stroke_width=5
-            )
-            right_arm = Line(
-                position + UP * 0.7,
-                position + RIGHT * 0.8 + UP * 0.2,  # Holding weapon
-                color=color,
-                stroke_width=5
-            )
-        elif pose == "calm":  # Yellow relaxed
-            left_arm = Line(
-                position + UP * 0.7,
-                position + LEFT * 0.4 + UP * 0.3,
-                color=color,
-                stroke_width=5
-            )
-            right_arm = Line(
-                position + UP * 0.7,
-                position + RIGHT * 0.4 + UP * 0.3,
-                color=color,
-                stroke_width=5
-            )
-        elif pose == "selfie":  # Peace sign pose
-            left_arm = Line(
-                position + UP * 0.7,
-                position + LEFT * 0.5 + DOWN * 0.1,
-                color=color,
-                stroke_width=5
-            )
-            right_arm = Line(
-                position + UP * 0.7,
-                position + RIGHT * 0.6 + UP * 0.1,
-                color=color,
-                stroke_width=5
-            )
-        else:  # Neutral/defeated
-            left_arm = Line(
-                position + UP * 0.7,
-                position + LEFT * 0.5 + DOWN * 0.1,
-                color=color,
-                stroke_width=5
-            )
-            right_arm = Line(
-                position + UP * 0.7,
-                position + RIGHT * 0.5 + DOWN * 0.1,
-                color=color,
-                stroke_width=5
-            )
-        
-        # Legs
-        left_leg = Line(
-            position + DOWN * 0.3,
-            position + LEFT * 0.3 + DOWN * 0.9,
-            color=color,
-            stroke_width=5
-        )
-        right_leg = Line(
-            position + DOWN * 0.3,
-            position + RIGHT * 0.3 + DOWN * 0.9,
-            color=color,
-            stroke_width=5
-        )
-        
-        # Add wiggle to all limbs
-        for limb in [head, body, left_arm, right_arm, left_leg, right_leg]:
-            limb.apply_function(
-                lambda p: p + np.array([random.uniform(-wiggle, wiggle) for _ in range(3)])
-            )
-        
-        group.add(head, body, left_arm, right_arm, left_leg, right_leg)
+        # Geometry comes from the shared pose library, only the copy is ours
+        group = pose_template(pose, color, stroke_width).copy()
+        group.shift(position)
+        
+        # Fresh wiggle for every stickman; head and body get a second pass, a little shakier
+        # than the limbs, as they always have
+        jitter(group, wiggle, self.rng)
+        head, body = group.submobjects[:2]
+        jitter(head, wiggle, self.rng)
+        jitter(body, wiggle, self.rng)
         return group
     
+    def draw_rig(self, color, position, pose="neutral", wiggle=0.02, stroke_width=6):
+        """Rigged stickman posed by joint angles - animate it with Repose or Walk"""
+        return StickmanRig(color, position, pose, stroke_width=stroke_width, wiggle=wiggle, rng=self.rng)
+    
+    def draw_crowd(self, count, colors, rows=5, stroke_width=4):
+        """Stadium of count spectators, batched into a few VMobjects - start_cheering() to animate"""
+        positions, scales = stadium_layout(count, rows=rows, rng=self.rng)
+        colors = [colors[i % len(colors)] for i in range(count)]
+        return Crowd(positions, colors, scales, stroke_width=stroke_width, rng=self.rng)
+    
     def draw_light_stick(self, stickman):
         """Simple glowing stick - like a lightsaber but sketchy"""
         stick = Line(
@@ -445,13 +538,13 @@ class StickmanFight(Scene):
             stroke_width=12
         )
         # Slight wobble
-        stick.apply_function(
-            lambda p: p + np.array([random.uniform(-0.01, 0.01) for _ in range(3)])
-        )
-        return stick
+        return jitter(stick, 0.01, self.rng)
     
     def draw_arrow(self, color):
-        """Simple comic-style arrow"""
+        """Simple comic-style arrow, from the effect pool - retire() it when it is gone"""
+        return self.effects.acquire(self.build_arrow, color)
+    
+    def build_arrow(self, color):
         shaft = Line(LEFT * 0.2, RIGHT * 0.6, color=color, stroke_width=4)
         tip = Polygon(
             [0.6, 0.05, 0],
@@ -464,20 +557,23 @@ class StickmanFight(Scene):
     
     def draw_suction_arrow(self):
         """Comedy suction cup arrow"""
-        shaft = Line(LEFT * 0.2, RIGHT * 0.5, color="#FFA500", stroke_width=4)
+        shaft = Line(LEFT * 0.2, RIGHT * 0.5, color=self.params["yellow_color"], stroke_width=4)
         cup = Arc(radius=0.2, angle=PI, color="#FF4444", stroke_width=6)
         cup.rotate(-90 * DEGREES)
         cup.move_to(RIGHT * 0.5)
         return VGroup(shaft, cup)
     
     def draw_impact(self, position):
-        """Comic book impact lines"""
+        """Comic book impact lines, from the effect pool - retire() them when they are gone"""
+        return self.effects.acquire(self.build_impact).shift(position)
+    
+    def build_impact(self):
         lines = VGroup()
         for i in range(8):
             angle = i * 45 * DEGREES
             line = Line(
-                position,
-                position + np.array([np.cos(angle), np.sin(angle), 0]) * 0.2,
+                ORIGIN,
+                np.array([np.cos(angle), np.sin(angle), 0]) * 0.2,
                 color="#FFAA00",
                 stroke_width=3
             )
@@ -485,12 +581,15 @@ class StickmanFight(Scene):
         return lines
     
     def draw_motion_lines(self, object, direction=RIGHT):
-        """Speed lines for movement"""
+        """Speed lines for movement, from the effect pool - retire() them when they are gone"""
+        return self.effects.acquire(self.build_motion_lines).shift(object.get_left())
+    
+    def build_motion_lines(self):
         lines = VGroup()
         for i in range(5):
             line = Line(
-                object.get_left() + LEFT * (i * 0.1),
-                object.get_left() + LEFT * (i * 0.1 + 0.3),
+                LEFT * (i * 0.1),
+                LEFT * (i * 0.1 + 0.3),
                 color="#CCCCCC",
                 stroke_width=2
             )
@@ -500,10 +599,12 @@ class StickmanFight(Scene):
     def draw_dust(self, position):
         """Sketchy dust marks"""
         dots = VGroup()
-        for _ in range(10):
+        offsets = self.rng.uniform([-0.5, -0.3], [0.5, 0.3], (10, 2))
+        radii = self.rng.uniform(0.01, 0.03, 10)
+        for (dx, dy), radius in zip(offsets, radii):
             dot = Dot(
-                position + np.array([random.uniform(-0.5, 0.5), random.uniform(-0.3, 0.3), 0]),
-                radius=random.uniform(0.01, 0.03),
+                position + np.array([dx, dy, 0]),
+                radius=radius,
                 color="#AAAAAA"
             )
             dots.add(dot)
@@ -511,7 +612,7 @@ class StickmanFight(Scene):
     
     def speech_bubble(self, text, speaker, color="#000000", font_size=28, bold=False):
         """Comic style speech bubble"""
-        txt = Text(
+        txt = cached_text(
             text,
             color=color,
             font_size=font_size,
@@ -547,7 +648,7 @@ class StickmanFight(Scene):
     
     def thought_bubble(self, text, thinker, color="#666666", font_size=26):
         """Thought bubble (cloud style)"""
-        txt = Text(
+        txt = cached_text(
             text,
             color=color,
             font_size=font_size,
@@ -577,3 +678,104 @@ class StickmanFight(Scene):
         circle3.next_to(circle2, DOWN, buff=0.03)
         
         return VGroup(bubble, circle1, circle2, circle3, txt)
+
+class ScreenplayScene(StickmanFight):
+    """A compiled screenplay (see screenplay.py), staged with StickmanFight's drawing helpers
+    
+    Every beat is a section of its own that starts from the cast's state on a
+    cleared stage, so it renders the same whatever the beats before it did.
+    """
+    
+    # The arrow hitting home, after its flight
+    HIT_TIME = 0.1
+    
+    def __init__(self, beats, ground=True, **kwargs):
+        self.beats = beats
+        self.ground = ground
+        self.SECTIONS = tuple(beat["name"] for beat in beats)
+        super().__init__(**kwargs)
+    
+    def construct(self):
+        self.camera.frame_rate = config.frame_rate
+        self.camera.background_color = "#F0F0F0"  # Paper white background
+        
+        for beat in self.beats:
+            self.begin_section(beat["name"])
+            cast = self.stage(beat["state"])
+            for action in beat["actions"]:
+                self.perform(action, cast, beat["state"])
+    
+    def stage(self, state):
+        """Clear the stage and draw every character where the beat starts, return name -> rig"""
+        self.clear()
+        self.static_layer = []
+        if self.ground:
+            ground = Line(LEFT * 7, RIGHT * 7, color="#888888", stroke_width=3)
+            ground.shift(DOWN * 1.8)
+            self.add(ground)
+            self.mark_static(ground)
+        
+        cast = {
+            name: self.draw_rig(
+                color=character["color"],
+                position=np.array([*character["position"], 0]),
+                pose=character["pose"]
+            )
+            for name, character in state.items()
+        }
+        self.add(*cast.values())
+        return cast
+    
+    def perform(self, action, cast, state):
+        """Play one normalized screenplay action, see screenplay.normalize_action"""
+        do = action["do"]
+        if do == "wait":
+            self.wait(action["seconds"])
+        elif do in ("say", "think"):
+            who = cast[action["who"]]
+            color = state[action["who"]]["color"]
+            if do == "say":
+                bubble = self.speech_bubble(action["text"], who, color=color, bold=action["bold"])
+            else:
+                bubble = self.thought_bubble(action["text"], who, color=color)
+            self.play(Write(bubble), run_time=action["write"])
+            if action["hold"] > 0:
+                self.wait(action["hold"])
+            self.remove(bubble)
+        elif do == "pose":
+            self.play(Repose(cast[action["who"]], action["to"]), run_time=action["run_time"])
+        elif do == "move":
+            who = cast[action["who"]]
+            by = np.array([*action["by"], 0])
+            animations = []
+            if action["walk"]:
+                strides = max(1, round(np.linalg.norm(by) / 0.75))
+                animations.append(Walk(who, by, strides=strides, base=action["pose"], rate_func=linear))
+            else:
+                animations.append(Repose(who, action["pose"], shift=by))
+            lines = self.draw_motion_lines(who) if action["motion_lines"] else None
+            if lines is not None:
+                animations.append(lines.animate.shift(by))
+            self.play(*animations, run_time=action["run_time"])
+            if lines is not None:
+                self.retire(lines)
+        elif do == "shoot":
+            shooter, target = cast[action["who"]], cast[action["at"]]
+            direction = 1 if target.get_center()[0] >= shooter.get_center()[0] else -1
+            if action["arrow"] == "suction":
+                arrow = self.draw_suction_arrow()
+            else:
+                arrow = self.draw_arrow(color=state[action["who"]]["color"])
+            if direction < 0:
+                arrow.rotate(PI)
+            arrow.move_to(shooter.get_center() + RIGHT * 0.8 * direction + UP * 0.3)
+            self.add(arrow)
+            self.play(arrow.animate.move_to(target.get_center() + UP * 0.3), run_time=action["run_time"])
+            
+            hit, effects = [FadeOut(arrow)], [arrow]
+            if action["impact"]:
+                impact = self.draw_impact(arrow.get_center())
+                hit.append(Create(impact))
+                effects.append(impact)
+            self.play(*hit, run_time=self.HIT_TIME)
+            self.retire(*effects)
@@ -0,0 +1,117 @@
+"""Draft renders of a few StickmanFight sections, for checking a tweak in seconds
+
+    python preview.py thwip                      # half size, 8 fps, NumPy preview camera
+    python preview.py thwip defeat --every 2     # ...only every 2nd of those frames
+    python preview.py "title card" --scale 1 --fps 16 --cairo   # full quality, still one section
+    python preview.py --list
+
+Sections before the selected ones are fast-forwarded without rasterizing a
+frame, the ones after them are not played at all. Unchanged plays come from
+a preview-only segment cache, so re-running after a small edit only renders
+what the edit touched.
+"""
+import argparse
+import os
+import sys
+import time
+
+import segment_cache
+
+PREVIEW_DIR = os.path.join("media", "previews")
+
+
+def preview_config(scale=0.5, fps=8, every=1, cairo=False):
+    """RENDER_CONFIG at a fraction of the resolution, sampling every Nth frame at fps"""
+    from render_video import RENDER_CONFIG
+
+    return {
+        **RENDER_CONFIG,
+        # Frames of the global grid at fps/every are exactly every Nth frame at fps
+        "frame_rate": fps / every,
+        # libx264 wants even dimensions
+        "pixel_width": max(2, int(RENDER_CONFIG["pixel_width"] * scale) // 2 * 2),
+        "pixel_height": max(2, int(RENDER_CONFIG["pixel_height"] * scale) // 2 * 2),
+        # Away from the production segment cache, so drafts neither fill it nor evict its
+        # segments; they could never be reused there anyway, the camera is part of every hash
+        "partial_movie_dir": os.path.join(PREVIEW_DIR, "segments_cairo" if cairo else "segments_preview"),
+    }
+
+
+def render_preview(sections, output_path=None, scale=0.5, fps=8, every=1, cairo=False, params=None):
+    """Render just these sections as a draft, stitched into output_path; return (path, frames)"""
+    from manim import tempconfig
+    from main import StickmanFight
+    from preview_renderer import PreviewCamera
+    from render_video import stitch
+    from renderer import StickmanRenderer
+
+    unknown = [name for name in sections if name not in StickmanFight.SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}")
+    if output_path is None:
+        output_path = os.path.join(PREVIEW_DIR, "_".join(name.replace(" ", "-") for name in sections) + ".mp4")
+
+    draft_config = preview_config(scale, fps, every, cairo)
+    with tempconfig(draft_config):
+        scene = StickmanFight(
+            renderer=StickmanRenderer(
+                camera_class=None if cairo else PreviewCamera,
+                defer_combine=True,
+                # Drafts are watched once, encode them as cheaply as possible
+                encoder={"preset": "ultrafast", "tune": "animation"}
+            ),
+            sections=sections,
+            params=params
+        )
+        scene.render()
+        paths = [
+            path
+            for section in scene.renderer.file_writer.sections
+            if not section.skip_animations
+            for path in section.get_clean_partial_movie_files()
+        ]
+
+    root, ext = os.path.splitext(output_path)
+    tmp_path = f"{root}.tmp{ext}"
+    stitch(paths, tmp_path)
+    os.replace(tmp_path, output_path)
+    segment_cache.discard_merged(paths)
+    segment_cache.evict(draft_config["partial_movie_dir"])
+    return output_path, scene.renderer.frames_written
+
+
+def main(argv=None):
+    from main import StickmanFight
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sections", nargs="*", help="sections to render, in any order")
+    parser.add_argument("--list", action="store_true", help="print the section names and exit")
+    parser.add_argument("--scale", type=float, default=0.5, help="fraction of the 720x1280 resolution")
+    parser.add_argument("--fps", type=float, default=8, help="frame rate to sample the timeline at")
+    parser.add_argument("--every", type=int, default=1, help="render only every Nth of those frames")
+    parser.add_argument("--cairo", action="store_true", help="use the production cairo camera")
+    parser.add_argument("--output", help=f"video path, default {PREVIEW_DIR}/<sections>.mp4")
+    args = parser.parse_args(argv)
+
+    if args.list or not args.sections:
+        print("Sections, in play order:")
+        for name in StickmanFight.SECTIONS:
+            print(f"  {name}")
+        return 0 if args.list else 2
+    if args.scale <= 0 or args.fps <= 0 or args.every < 1:
+        parser.error("--scale and --fps must be positive, --every at least 1")
+
+    start = time.perf_counter()
+    try:
+        output_path, frames = render_preview(
+            args.sections, args.output, args.scale, args.fps, args.every, args.cairo
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"🎞️ Preview written to {output_path}: {frames} frames in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""Draft camera that rasterizes strokes and fills with NumPy and Pillow instead of cairo
+
+    python preview_renderer.py            # pixel-diff and speed check against cairo
+
+Béziers are flattened to polylines in one vectorized pass, drawn by Pillow into
+a small supersampled coverage mask and blended into the frame buffer; text is
+rasterized once by cairo and then pasted as a sprite.
+"""
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+from manim import Camera, SVGMobject, VMobject
+from PIL import Image, ImageChops, ImageDraw
+
+from text_cache import CachedText
+
+# Longest polyline segment a Bézier curve is flattened into, in pixels
+SEGMENT_PIXELS = 8
+# Strokes and fills are drawn this many times larger, then box-filtered down
+SUPERSAMPLE = 4
+# Text sprites kept around, keyed by shape and style
+SPRITE_CACHE_SIZE = 256
+# Worst bounding box allowed to differ from cairo: mean error in 0-255 levels, share of pixels off
+MAX_ERROR = 6.0
+MAX_OFF = 0.05
+# Drawn whole as one cached sprite: manim's Text and other SVGs, and text_cache lines
+SPRITE_TYPES = (SVGMobject, CachedText)
+
+
+class PreviewCamera(Camera):
+    """Camera for draft renders: close to the cairo output, for a fraction of the work
+
+    Only what StickmanFight draws is handled natively: stroked and filled
+    VMobjects take the mask path (fills even-odd), text and other SVGs become
+    cached sprites, anything else (images, point clouds) goes to the usual
+    cairo displayers. Gradients draw in their first color and background
+    strokes are skipped.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sprites = OrderedDict()
+        self.scratch = None
+
+    def capture_mobjects(self, mobjects, **kwargs):
+        for mobject in self.preview_items(mobjects, kwargs.get("excluded_mobjects")):
+            if isinstance(mobject, SPRITE_TYPES):
+                self.draw_sprite(mobject)
+            elif isinstance(mobject, VMobject) and not mobject.get_background_image():
+                self.draw_vmobject(mobject)
+            else:
+                self.display_funcs[self.type_or_raise(mobject)]([mobject], self.pixel_array)
+
+    def preview_items(self, mobjects, excluded_mobjects=None):
+        """Mobjects in draw order, with each text kept whole so it can be a sprite"""
+        excluded = set()
+        for mobject in excluded_mobjects or []:
+            excluded.update(map(id, mobject.get_family()))
+        if self.use_z_index:
+            mobjects = sorted(mobjects, key=lambda mobject: mobject.z_index)
+
+        items = []
+
+        def visit(mobject):
+            if id(mobject) in excluded:
+                return
+            if isinstance(mobject, SPRITE_TYPES):
+                if mobject.family_members_with_points():
+                    items.append(mobject)
+                return
+            if len(mobject.points):
+                items.append(mobject)
+            for submobject in mobject.submobjects:
+                visit(submobject)
+
+        for mobject in mobjects:
+            visit(mobject)
+        return items
+
+    # ---------- Strokes and fills ----------
+
+    def pixel_coords(self, points):
+        """Float pixel coordinates, same transform as the cairo context"""
+        scale = self.pixel_width / self.frame_width
+        coords = np.empty((len(points), 2))
+        coords[:, 0] = (points[:, 0] - self.frame_center[0]) * scale + self.pixel_width / 2
+        coords[:, 1] = (self.frame_center[1] - points[:, 1]) * scale + self.pixel_height / 2
+        return coords
+
+    def draw_vmobject(self, vmobject):
+        points = self.transform_points_pre_display(vmobject, vmobject.points)
+        if len(points) < 4:
+            return
+        curves = self.pixel_coords(points[:len(points) // 4 * 4]).reshape(-1, 4, 2)
+
+        fill = vmobject.get_fill_rgbas()[0]
+        if fill[3] > 0:
+            self.fill_curves(curves, fill)
+        width = vmobject.get_stroke_width()
+        stroke = vmobject.get_stroke_rgbas()[0]
+        if width > 0 and stroke[3] > 0:
+            radius = width * self.cairo_line_width_multiple * self.pixel_width / self.frame_width / 2
+            self.stroke_curves(curves, radius, stroke)
+
+    def stroke_curves(self, curves, radius, rgba):
+        window = self.window(curves.reshape(-1, 2), radius + 2)
+        if window is None:
+            return
+        mask, draw = self.mask(window)
+        starts, ends, subpaths = flatten_curves(curves)
+        width = max(int(round(2 * radius * SUPERSAMPLE)), 1)
+        for polyline in self.polylines(starts, ends, subpaths, window):
+            draw.line(polyline, fill=255, width=width)
+        # Pillow lines have no joins (joint="curve" costs ~10x), so round off sharp corners only
+        dot = radius * SUPERSAMPLE
+        for x, y in self.to_mask(sharp_corners(starts, ends, subpaths), window):
+            draw.ellipse((x - dot, y - dot, x + dot, y + dot), fill=255)
+        self.composite(window, mask, rgba)
+
+    def fill_curves(self, curves, rgba):
+        window = self.window(curves.reshape(-1, 2), 1)
+        if window is None:
+            return
+        mask, draw = self.mask(window)
+        polylines = [
+            polyline for polyline in self.polylines(*flatten_curves(curves), window) if len(polyline) > 4
+        ]
+        if len(polylines) == 1:
+            draw.polygon(polylines[0], fill=255)
+        elif polylines:
+            # Even-odd, one subpath at a time: the inside of an "o" or "e" is drawn twice and cut out
+            layer, pen = self.mask(window)
+            for polyline in polylines:
+                layer.paste(0, (0, 0) + layer.size)
+                pen.polygon(polyline, fill=255)
+                mask = ImageChops.difference(mask, layer)
+        self.composite(window, mask, rgba)
+
+    def mask(self, window):
+        """Blank supersampled coverage mask for window, and a Pillow pen on it"""
+        x0, y0, x1, y1 = window
+        mask = Image.new("L", ((x1 - x0) * SUPERSAMPLE, (y1 - y0) * SUPERSAMPLE))
+        return mask, ImageDraw.Draw(mask)
+
+    def to_mask(self, coords, window):
+        # Pixel centres sit at +0.5 in cairo, on the grid in Pillow
+        return (coords - window[:2]) * SUPERSAMPLE - 0.5
+
+    def polylines(self, starts, ends, subpaths, window):
+        """Flat [x0, y0, x1, y1, ...] lists of each subpath, in mask coordinates"""
+        points = self.to_mask(starts, window)
+        last = self.to_mask(ends, window)
+        splits = np.flatnonzero(np.diff(subpaths)) + 1
+        for subpath_points, subpath_ends in zip(np.split(points, splits), np.split(last, splits)):
+            yield np.append(subpath_points, subpath_ends[-1:], axis=0).ravel().tolist()
+
+    def window(self, coords, margin):
+        """Clipped pixel box (x0, y0, x1, y1) around coords, None when off screen"""
+        x0, y0 = np.floor(coords.min(axis=0) - margin).astype(int)
+        x1, y1 = np.ceil(coords.max(axis=0) + margin).astype(int) + 1
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.pixel_width), min(y1, self.pixel_height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def composite(self, window, mask, rgba):
+        """Blend one color over the frame through a coverage mask, premultiplied like cairo"""
+        x0, y0, x1, y1 = window
+        coverage = mask.reduce(SUPERSAMPLE)
+        if rgba[3] < 1:
+            coverage = coverage.point(lambda value: value * rgba[3])
+        # Pillow's masked paste is the same lerp, alpha channel included, in C
+        region = self.pixel_array[y0:y1, x0:x1]
+        image = Image.fromarray(np.ascontiguousarray(region), "RGBA")
+        image.paste(tuple(int(channel * 255 + 0.5) for channel in rgba[:3]) + (255,), None, coverage)
+        region[:] = np.asarray(image)
+
+    # ---------- Text sprites ----------
+
+    def draw_sprite(self, mobject):
+        members = mobject.family_members_with_points()
+        anchor = self.pixel_coords(members[0].points[:1])[0]
+        key = sprite_key(members)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.rasterize_sprite(members, anchor)
+            self.sprites[key] = sprite
+            if len(self.sprites) > SPRITE_CACHE_SIZE:
+                self.sprites.popitem(last=False)
+        else:
+            self.sprites.move_to_end(key)
+
+        image, offset = sprite
+        if image is None:
+            return
+        x0, y0 = np.round(anchor + offset).astype(int)
+        height, width = image.shape[:2]
+        # Clip the paste to the frame
+        left, top = max(-x0, 0), max(-y0, 0)
+        right, bottom = min(width, self.pixel_width - x0), min(height, self.pixel_height - y0)
+        if left >= right or top >= bottom:
+            return
+        source = image[top:bottom, left:right]
+        region = self.pixel_array[y0 + top:y0 + bottom, x0 + left:x0 + right]
+        region[:] = source * 255 + region * (1 - source[..., 3:]) + 0.5
+
+    def rasterize_sprite(self, members, anchor):
+        """(premultiplied float RGBA image, offset from the anchor) drawn once by cairo"""
+        if self.scratch is None or self.scratch.shape != self.pixel_array.shape:
+            self.scratch = np.zeros_like(self.pixel_array)
+        self.scratch[:] = 0
+        self.display_multiple_vectorized_mobjects(members, self.scratch)
+
+        rows = np.flatnonzero(self.scratch[..., 3].any(axis=1))
+        columns = np.flatnonzero(self.scratch[..., 3].any(axis=0))
+        if not len(rows):
+            return None, None
+        y0, y1, x0, x1 = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+        image = self.scratch[y0:y1, x0:x1].astype(np.float32) / 255
+        return image, np.array([x0, y0]) - anchor
+
+
+def flatten_curves(curves, segment_pixels=SEGMENT_PIXELS):
+    """Split (N, 4, 2) cubic Béziers into short straight segments, all curves at once
+
+    Returns (starts, ends, subpaths), subpaths numbering the run of connected
+    curves each segment belongs to.
+    """
+    # The control polygon is never shorter than the curve
+    lengths = np.linalg.norm(np.diff(curves, axis=1), axis=2).sum(axis=1)
+    counts = np.maximum(np.ceil(lengths / segment_pixels).astype(int), 1)
+    owner = np.repeat(np.arange(len(curves)), counts)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    steps = counts[owner]
+
+    # A new subpath starts wherever a curve does not continue the last one
+    breaks = np.ones(len(curves), dtype=bool)
+    breaks[1:] = np.any(np.abs(curves[1:, 0] - curves[:-1, 3]) > 1e-3, axis=1)
+    subpaths = np.cumsum(breaks)[owner]
+    return bezier_points(curves[owner], local / steps), bezier_points(curves[owner], (local + 1) / steps), subpaths
+
+
+def sharp_corners(starts, ends, subpaths, cos_limit=0.95):
+    """Vertices where a subpath turns by more than ~18 degrees"""
+    directions = ends - starts
+    directions /= np.maximum(np.linalg.norm(directions, axis=1), 1e-9)[:, None]
+    turns = (directions[:-1] * directions[1:]).sum(axis=1) < cos_limit
+    return starts[1:][turns & (subpaths[:-1] == subpaths[1:])]
+
+
+def bezier_points(curves, t):
+    t = t[:, None]
+    s = 1 - t
+    return (
+        s ** 3 * curves[:, 0] + 3 * s ** 2 * t * curves[:, 1]
+        + 3 * s * t ** 2 * curves[:, 2] + t ** 3 * curves[:, 3]
+    )
+
+
+def sprite_key(members):
+    """Hash of a text's shape relative to its first point, plus its style"""
+    digest = hashlib.blake2b(digest_size=16)
+    anchor = members[0].points[0]
+    for member in members:
+        digest.update(np.round(member.points - anchor, 4).tobytes())
+        digest.update(member.get_fill_rgbas().tobytes())
+        digest.update(member.get_stroke_rgbas().tobytes())
+        digest.update(np.float64(member.get_stroke_width()).tobytes())
+    return digest.digest()
+
+
+def frame_difference(mobjects, tolerance=48, margin=4):
+    """Compare PreviewCamera with cairo on the same mobjects, one bounding box at a time
+
+    Each family member with points is compared inside its pixel box, grown
+    by margin, so a mistake in one small shape is not averaged away over the
+    empty frame. Returns (mean absolute error in 0-255 levels, share of
+    pixels off by more than tolerance in any channel), each the worst of any
+    box, then cairo seconds and preview seconds.
+    """
+    frames, seconds = [], []
+    for camera in (Camera(), PreviewCamera()):
+        # Once to warm up (text sprites, cairo context), once timed
+        for _ in range(2):
+            start = time.perf_counter()
+            camera.reset()
+            camera.capture_mobjects(mobjects)
+            elapsed = time.perf_counter() - start
+        frames.append(camera.pixel_array.astype(int))
+        seconds.append(elapsed)
+    difference = np.abs(frames[0] - frames[1])
+
+    error = off = 0.0
+    for mobject in mobjects:
+        for member in mobject.family_members_with_points():
+            # camera is the PreviewCamera, drawn last; both map points to the same pixels
+            window = camera.window(camera.pixel_coords(member.points), margin)
+            if window is None:
+                continue
+            x0, y0, x1, y1 = window
+            box = difference[y0:y1, x0:x1]
+            error = max(error, box.mean())
+            off = max(off, (box.max(axis=2) > tolerance).mean())
+    return error, off, seconds[0], seconds[1]
+
+
+def building_blocks(scene):
+    """{name: mobjects} of what StickmanFight draws, one sample per frame to compare"""
+    from manim import DOWN, LEFT, RIGHT, UP
+    from stickman import POSES
+
+    blue_color = scene.DEFAULT_PARAMS["blue_color"]
+    yellow_color = scene.DEFAULT_PARAMS["yellow_color"]
+    blue = scene.draw_stickman(blue_color, LEFT * 1.2 + DOWN * 0.5)
+    samples = {f"stickman[{pose}]": [scene.draw_stickman(yellow_color, UP * 2, pose=pose)] for pose in POSES}
+    samples["speech_bubble"] = [blue, scene.speech_bubble("This ends now.", blue, color=blue_color)]
+    samples["impact"] = [scene.draw_impact(RIGHT * 0.5)]
+    samples["dust"] = [scene.draw_dust(DOWN * 2)]
+    samples["crowd"] = [scene.draw_crowd(200, [blue_color, yellow_color])]
+    return samples
+
+
+def check(max_error=MAX_ERROR, max_off=MAX_OFF):
+    """Draw StickmanFight's building blocks both ways, fail past the tolerances"""
+    from manim import tempconfig
+    from main import StickmanFight
+    from render_video import RENDER_CONFIG
+    from renderer import StickmanRenderer
+
+    failures = []
+    with tempconfig(RENDER_CONFIG):
+        scene = StickmanFight(renderer=StickmanRenderer(defer_combine=True, skip_animations=True))
+        scene.setup()
+
+        # Worst bounding box of each sample, not the whole frame
+        for name, mobjects in building_blocks(scene).items():
+            error, off, cairo_seconds, preview_seconds = frame_difference(mobjects)
+            failed = error > max_error or off > max_off
+            if failed:
+                failures.append(name)
+            print(f"  {name:<24}{error:>7.2f} levels{off:>8.2%} off"
+                  f"{cairo_seconds * 1000:>9.1f}ms -> {preview_seconds * 1000:>7.1f}ms"
+                  f"{'  <-- OVER TOLERANCE' if failed else ''}")
+    if failures:
+        print(f"❌ Preview differs from cairo past tolerance: {', '.join(failures)}")
+        return 1
+    print("✅ Preview matches cairo within tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(check())
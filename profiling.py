@@ -0,0 +1,133 @@
+"""Opt-in per-animation timings of a render, written out as a JSON report"""
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+REPORT_PATH = os.path.join("media", "render_profile.json")
+
+
+class RenderProfile:
+    """Where the time of each play went: building mobjects, rasterizing or encoding"""
+
+    def __init__(self):
+        self.animations = []
+        self.stages = {"rasterize": 0.0, "encode": 0.0}
+        self.mark = time.perf_counter()
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] += time.perf_counter() - start
+
+    def skip(self):
+        """Forget the time since the last play, e.g. a fast-forwarded one"""
+        self.mark = time.perf_counter()
+        self.stages = dict.fromkeys(self.stages, 0.0)
+
+    def record(self, scene, index, frames, cached):
+        """Close off one play, charging everything since the previous one to it"""
+        now = time.perf_counter()
+        wall = now - self.mark
+        family = scene.get_mobject_family_members()
+        effects = getattr(scene, "effects", None)
+        self.animations.append({
+            "section": scene.section,
+            "index": index,
+            "animations": [type(animation).__name__ for animation in scene.animations],
+            "run_time": round(scene.duration, 4),
+            "cached": cached,
+            "frames": frames,
+            "mobjects": len(family),
+            "points": sum(len(mobject.points) for mobject in family),
+            # Memory over the render: these should stay flat however long the episode gets
+            "point_bytes": sum(mobject.points.nbytes for mobject in family),
+            "rss_bytes": rss_bytes(),
+            "effects_built": effects.built if effects is not None else 0,
+            "wall_seconds": round(wall, 4),
+            # Construct code since the last play (text, drawing helpers) plus interpolation
+            "setup_seconds": round(wall - sum(self.stages.values()), 4),
+            "rasterize_seconds": round(self.stages["rasterize"], 4),
+            "encode_seconds": round(self.stages["encode"], 4),
+        })
+        self.mark = now
+        self.stages = dict.fromkeys(self.stages, 0.0)
+
+
+def rss_bytes():
+    """Resident set size of this process now, or its peak where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes everywhere but macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_report(animations, sections):
+    """Report dict of per-animation records, in play order, with per-section totals"""
+    order = {name: i for i, name in enumerate(sections)}
+    animations = sorted(animations, key=lambda record: (order.get(record["section"], -1), record["index"]))
+
+    keys = ("frames", "wall_seconds", "setup_seconds", "rasterize_seconds", "encode_seconds")
+    peaks = ("mobjects", "point_bytes", "rss_bytes")
+    totals = {}
+    for record in animations:
+        section = totals.setdefault(record["section"], dict.fromkeys(keys, 0))
+        section["animations"] = section.get("animations", 0) + 1
+        for key in keys:
+            section[key] = round(section[key] + record[key], 4)
+        for key in peaks:
+            section[f"peak_{key}"] = max(section.get(f"peak_{key}", 0), record.get(key, 0))
+
+    overall = {key: round(sum(section[key] for section in totals.values()), 4) for key in keys}
+    overall["animations"] = len(animations)
+    for key in peaks:
+        overall[f"peak_{key}"] = max((section[f"peak_{key}"] for section in totals.values()), default=0)
+    return {"animations": animations, "sections": totals, "total": overall}
+
+
+def write_report(report, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def summary_table(report, slowest=5):
+    """Short plain-text table: per-section totals, then the slowest animations"""
+    header = f"{'section':<16}{'plays':>6}{'frames':>8}{'wall':>8}{'setup':>8}{'raster':>8}{'encode':>8}"
+    rows = [header, "-" * len(header)]
+
+    def row(name, totals):
+        return (
+            f"{name:<16}{totals['animations']:>6}{totals['frames']:>8}"
+            f"{totals['wall_seconds']:>8.2f}{totals['setup_seconds']:>8.2f}"
+            f"{totals['rasterize_seconds']:>8.2f}{totals['encode_seconds']:>8.2f}"
+        )
+
+    for name, totals in report["sections"].items():
+        rows.append(row(name[:15], totals))
+    rows.append("-" * len(header))
+    rows.append(row("total", report["total"]))
+    total = report["total"]
+    rows.append(
+        f"peak memory: {total.get('peak_mobjects', 0)} mobjects, "
+        f"{total.get('peak_point_bytes', 0) / 2**20:.1f} MB of points, "
+        f"{total.get('peak_rss_bytes', 0) / 2**20:.0f} MB RSS"
+    )
+
+    rows.append("")
+    rows.append("slowest animations:")
+    ranked = sorted(report["animations"], key=lambda record: record["wall_seconds"], reverse=True)
+    for record in ranked[:slowest]:
+        rows.append(
+            f"  {record['wall_seconds']:>7.3f}s  {record['section']} #{record['index']}  "
+            f"{'+'.join(record['animations'])}  ({record['points']} points)"
+        )
+    return "\n".join(rows)
@@ -0,0 +1,174 @@
+"""On-demand renders of StickmanFight variants, queued and deduplicated by parameters"""
+import functools
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+RENDERS_DIR = os.path.join("media", "renders")
+
+COLOR_RE = re.compile(r"^#[0-9A-Fa-f]{6}$")
+MAX_LINE_LENGTH = 80
+# Finished (done or failed) jobs remembered for GET /jobs/<id>, oldest forgotten first
+MAX_HISTORY = 256
+
+
+def default_params():
+    from main import StickmanFight
+    return StickmanFight.DEFAULT_PARAMS
+
+
+def normalize_params(raw):
+    """Validated, fully filled-in render parameters, ValueError if anything is off"""
+    defaults = default_params()
+    if not isinstance(raw, dict):
+        raise ValueError("parameters must be a JSON object")
+    unknown = set(raw) - set(defaults)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+
+    params = {**defaults, **raw}
+    for key in ("blue_color", "yellow_color"):
+        if not isinstance(params[key], str) or not COLOR_RE.match(params[key]):
+            raise ValueError(f"{key} must look like #RRGGBB")
+        params[key] = params[key].upper()
+
+    if not is_int(params["fps"]) or not 1 <= params["fps"] <= 60:
+        raise ValueError("fps must be a whole number from 1 to 60")
+    for key in ("width", "height"):
+        value = params[key]
+        # yuv420p needs even dimensions
+        if not is_int(value) or not 128 <= value <= 1920 or value % 2:
+            raise ValueError(f"{key} must be an even number of pixels from 128 to 1920")
+
+    dialogue = params["dialogue"]
+    if not isinstance(dialogue, dict):
+        raise ValueError("dialogue must be an object of line name to text")
+    unknown = set(dialogue) - set(defaults["dialogue"])
+    if unknown:
+        raise ValueError(f"unknown dialogue lines: {', '.join(sorted(unknown))}")
+    for name, text in dialogue.items():
+        if not isinstance(text, str) or not text.strip() or len(text) > MAX_LINE_LENGTH:
+            raise ValueError(f"dialogue line {name} must be 1 to {MAX_LINE_LENGTH} characters")
+    params["dialogue"] = {**defaults["dialogue"], **dialogue}
+    return params
+
+
+def is_int(value):
+    # JSON true/false would otherwise pass as 1/0
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def params_hash(params):
+    """Stable id of a normalized parameter set on this build, so equal requests share one render
+
+    The build is part of it: a video rendered before a deploy changed the
+    sources or libraries is rendered again, not served stale.
+    """
+    canonical = json.dumps({"params": params, "build": build_key()}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=None)
+def build_key():
+    """Hash of the sources and library versions this process renders with, as in artifact_cache"""
+    from artifact_cache import artifact_key
+
+    return artifact_key({})[0]
+
+
+class RenderJob:
+    """One requested variant and where its video ends up"""
+
+    def __init__(self, job_id, params, path, state="queued"):
+        self.id = job_id
+        self.params = params
+        self.path = path
+        self.state = state
+        self.error = None
+        self.created = time.time()
+        self.finished = time.time() if state == "done" else None
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "error": self.error,
+            "url": f"/{self.path}" if self.state == "done" else None,
+            "elapsed_seconds": round((self.finished or time.time()) - self.created, 1),
+        }
+
+
+class RenderJobs:
+    """Bounded queue of render jobs drained by a pool of worker processes"""
+
+    def __init__(self, render, workers=1, max_queued=8, directory=RENDERS_DIR, max_history=MAX_HISTORY):
+        # render(params, output_path) runs in a worker process
+        self.render = render
+        self.directory = directory
+        self.max_history = max_history
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.queue = queue.Queue(maxsize=max_queued)
+        # spawn, not fork: the parent is already running server threads
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        for _ in range(workers):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def submit(self, raw_params):
+        """The job for these parameters, existing or new; queue.Full when too busy"""
+        params = normalize_params(raw_params)
+        job_id = params_hash(params)
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.state != "failed":
+                # Coalesce with the identical request that is queued, running or done
+                return job
+
+            path = os.path.join(self.directory, f"{job_id}.mp4")
+            if os.path.exists(path):
+                # Rendered before by this build, possibly in an earlier run
+                job = RenderJob(job_id, params, path, state="done")
+            else:
+                job = RenderJob(job_id, params, path)
+                self.queue.put_nowait(job)
+            self.jobs[job_id] = job
+            self.prune()
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def work(self):
+        while True:
+            job = self.queue.get()
+            job.state = "rendering"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self.pool.submit(self.render, job.params, job.path).result()
+                job.state = "done"
+            except Exception as e:
+                job.state = "failed"
+                job.error = str(e)
+            job.finished = time.time()
+            with self.lock:
+                self.prune()
+            self.queue.task_done()
+
+    def prune(self):
+        """Forget the oldest finished jobs past max_history; call with the lock held
+
+        A forgotten done job is found again on disk when it is asked for.
+        """
+        finished = [job for job in self.jobs.values() if job.state in ("done", "failed")]
+        if len(finished) <= self.max_history:
+            return
+        finished.sort(key=lambda job: job.finished)
+        for job in finished[:len(finished) - self.max_history]:
+            del self.jobs[job.id]
@@ -1,168 +1,503 @@
 import os
 import sys
+import subprocess
 import traceback
 import http.server
-import socketserver
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from multiprocessing import get_context
 
-def render_video():
-    """Render the animation without requiring shell access"""
+import artifact_cache
+import profiling
+import renditions
+import segment_cache
+from hls_stream import HlsStream
+from render_jobs import RenderJobs
+from video_server import RenderStatus, VideoRequestHandler
+
+# Where the stitched video ends up (the download link points here)
+VIDEO_PATH = "media/videos/1280p16/stickman_fight.mp4"
+
+# Extra encodings made from one render, e.g. "1080p,720p,480p,webm,teaser_gif"
+# (see renditions.RENDITIONS); the video is rendered once, at the largest size
+RENDITIONS = renditions.parse_names(os.environ.get("STICKMAN_RENDITIONS", ""))
+MASTER_PATH = os.path.join(renditions.RENDITION_DIR, "master.mp4")
+
+# Sections render in parallel, one worker process per core by default
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+
+# On-demand variants from POST /render: how many render at once, how many may wait
+RENDER_API_WORKERS = int(os.environ.get("RENDER_API_WORKERS", "1"))
+RENDER_QUEUE_SIZE = int(os.environ.get("RENDER_QUEUE_SIZE", "8"))
+
+# libx264 settings of every partial movie; they are part of the segment cache key
+ENCODER = {
+    "preset": os.environ.get("STICKMAN_X264_PRESET", "veryfast"),
+    "crf": int(os.environ.get("STICKMAN_X264_CRF", "23")),
+    # Flat colors and hard edges: tune=animation spends bits where they show
+    "tune": os.environ.get("STICKMAN_X264_TUNE", "animation") or None,
+    # 0 lets x264 pick; with one section worker per core, 1-2 avoids oversubscribing
+    "threads": int(os.environ.get("STICKMAN_X264_THREADS", "0")),
+    "keyint": None,
+}
+
+# Publish each finished section to a live HLS playlist, so the page can play it mid-render
+STREAM = os.environ.get("STICKMAN_STREAM", "1") == "1"
+
+# STICKMAN_PROFILE=1 times every animation and writes profiling.REPORT_PATH
+PROFILE = os.environ.get("STICKMAN_PROFILE") == "1"
+
+# Configure for phone/render.com
+RENDER_CONFIG = {
+    "quality": "low_quality",
+    "frame_rate": 16,
+    "pixel_width": 720,
+    "pixel_height": 1280,
+    "output_file": "stickman_fight",  # This sets the output filename
+    # Wiggle is seeded, so unchanged animations hash the same across deploys
+    "disable_caching": False,
+    "partial_movie_dir": segment_cache.CACHE_DIR,
+    "save_last_frame": False,
+    "save_pngs": False,
+    "progress_bar": "none"
+}
+
+def variant_config(params=None):
+    """RENDER_CONFIG with a variant's frame rate and resolution"""
+    if params is None:
+        return RENDER_CONFIG
+    return {
+        **RENDER_CONFIG,
+        "frame_rate": params["fps"],
+        "pixel_width": params["width"],
+        "pixel_height": params["height"],
+    }
+
+def render_sections(sections=None, progress=None, params=None, profile=False, on_section=None):
+    """Render some sections of StickmanFight in this process, return their partial movies and timings"""
+    from manim import tempconfig
+    from main import StickmanFight
+    from renderer import StickmanRenderer
+    
+    if progress is None and _progress_queue is not None:
+        progress = _report_progress
+    
+    with tempconfig(variant_config(params)):
+        scene = StickmanFight(
+            renderer=StickmanRenderer(
+                defer_combine=True,
+                profile=profiling.RenderProfile() if profile else None,
+                encoder=ENCODER,
+                on_section=on_section
+            ),
+            sections=sections,
+            progress=progress,
+            params=params
+        )
+        scene.render()
+        # Only the scene's own sections, not manim's implicit "autocreated" one
+        partial_movies = {
+            section.name: section.get_clean_partial_movie_files()
+            for section in scene.renderer.file_writer.sections
+            if not section.skip_animations and section.name in scene.SECTIONS
+        }
+        return partial_movies, scene.renderer.profile and scene.renderer.profile.animations
+
+def plan_render(params=None):
+    """Fast-forward the whole scene to count its animations and frames"""
+    from manim import config, tempconfig
+    from main import StickmanFight
+    from renderer import StickmanRenderer
+    
+    with tempconfig(variant_config(params)):
+        scene = StickmanFight(
+            renderer=StickmanRenderer(defer_combine=True, skip_animations=True),
+            params=params
+        )
+        scene.render()
+        return scene.renderer.num_plays, round(scene.renderer.time * config.frame_rate)
+
+# Section workers send (animations, frames) progress back through this queue
+_progress_queue = None
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+
+def _report_progress(animations, frames):
+    _progress_queue.put((animations, frames))
+
+def render_movie(output_path, workers=RENDER_WORKERS, status=None, params=None, profile=False, stream=None):
+    """Render every section, one worker process each, and publish them stitched as output_path
+
+    With a stream (hls_stream.HlsStream), every section is also appended to
+    its live playlist as soon as it and the ones before it are done.
+    Returns the profiling report when profile is set, otherwise None.
+    """
+    from main import StickmanFight
+    
+    if status is not None:
+        status.begin(*plan_render(params))
+    
+    def section_done(name, paths):
+        if stream is None:
+            return
+        stream.add(name, paths)
+        if status is not None and stream.started:
+            status.stream_started(stream.url)
+    
+    partial_movies = {}
+    timings = []
+    if workers > 1:
+        # spawn, not fork: the parent is already running server threads
+        context = get_context("spawn")
+        queue = context.Queue()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(queue,)
+        ) as pool:
+            pending = {
+                pool.submit(render_sections, [name], params=params, profile=profile)
+                for name in StickmanFight.SECTIONS
+            }
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                while not queue.empty():
+                    progress = queue.get()
+                    if status is not None:
+                        status.advance(*progress)
+                for future in done:
+                    rendered, animations = future.result()
+                    partial_movies.update(rendered)
+                    timings.extend(animations or [])
+                    print(f"🎬 Section rendered: {', '.join(rendered)}")
+                    for name, paths in rendered.items():
+                        section_done(name, paths)
+    else:
+        partial_movies, animations = render_sections(
+            progress=status and status.advance,
+            params=params,
+            profile=profile,
+            on_section=section_done
+        )
+        timings.extend(animations or [])
+    
+    # Stitch next to the target and swap it in, so nobody downloads half a file
+    root, ext = os.path.splitext(output_path)
+    tmp_path = f"{root}.tmp{ext}"
+    paths = [path for name in StickmanFight.SECTIONS for path in partial_movies.get(name, [])]
+    stitch(paths, tmp_path)
+    os.replace(tmp_path, output_path)
+    if stream is not None:
+        stream.finish()
+    
+    # Merged runs of short plays are never reused, keep them out of the cache
+    segment_cache.discard_merged(paths)
+    segment_cache.evict()
+    
+    if not profile:
+        return None
+    report = profiling.build_report(timings, StickmanFight.SECTIONS)
+    profiling.write_report(report)
+    return report
+
+def stitch(partial_movies, output_path):
+    """Losslessly join partial movies with ffmpeg's concat demuxer"""
+    from manim import config
+    
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w") as f:
+        for path in partial_movies:
+            f.write(f"file 'file:{os.path.abspath(path)}'\n")
+    subprocess.run(
+        [
+            config.ffmpeg_executable, "-y", "-nostdin", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-an", output_path,
+        ],
+        check=True
+    )
+    os.remove(list_path)
+    
+    # Mark the segments as recently used for the cache's LRU eviction
+    for path in partial_movies:
+        os.utime(path)
+
+def rendition_outputs():
+    """Where each requested rendition goes; the phone-sized MP4 is always made, it is the main download"""
+    return {
+        name: VIDEO_PATH if name == "720p" else renditions.rendition_path(name)
+        for name in dict.fromkeys(["720p", *RENDITIONS])
+    }
+
+def render_renditions(status=None, profile=False, stream=None):
+    """Render the master once at the largest rendition size, then encode every rendition from it"""
+    outputs = rendition_outputs()
+    width, height = renditions.master_size(outputs)
+    params = {"fps": RENDER_CONFIG["frame_rate"], "width": width, "height": height}
+    report = render_movie(MASTER_PATH, status=status, params=params, profile=profile, stream=stream)
+    renditions.encode(MASTER_PATH, outputs, (width, height))
+    for name, path in outputs.items():
+        print(f"🎞️ {renditions.RENDITIONS[name]['label']}: {path}")
+    return report
+
+def render_variant(params, output_path):
+    """Render one POST /render variant; runs in a RenderJobs worker process"""
+    render_movie(output_path, workers=1, params=params)
+
+def render_inputs():
+    """Everything besides the sources and libraries that decides what the main video looks like"""
+    from main import StickmanFight
+    
+    return {
+        "config": RENDER_CONFIG,
+        "encoder": ENCODER,
+        "renditions": RENDITIONS,
+        "seed": StickmanFight.seed,
+        "params": StickmanFight.DEFAULT_PARAMS,
+        "sections": StickmanFight.SECTIONS,
+    }
+
+def render_in_background(status):
+    """Render the animation and publish it, reporting progress to status"""
     try:
-        from manim import config, tempconfig
-        
-        # Configure for phone/render.com
-        with tempconfig({
-            "quality": "low_quality",
-            "frame_rate": 16,
-            "pixel_width": 720,
-            "pixel_height": 1280,
-            "output_file": "stickman_fight",  # This sets the output filename
-            "disable_caching": True,
-            "save_last_frame": False,
-            "save_pngs": False,
-            "progress_bar": "none"
-        }):
-            # Import and render
+        # Nothing changed since a finished render: publish that one instead
+        key, inputs = artifact_cache.artifact_key(render_inputs())
+        manifest = artifact_cache.lookup(key)
+        if manifest is not None:
+            outputs = artifact_cache.restore(manifest)
+            print(f"♻️ Inputs unchanged, serving the stored render {key} ({manifest['created']})")
+        else:
             from main import StickmanFight
-            scene = StickmanFight()
-            scene.render()
             
-        print("✅ Video rendered successfully!")
-        
-        # Check multiple possible video paths
-        possible_paths = [
-            "media/videos/main/720p16/stickman_fight.mp4",
-            "media/videos/720p16/stickman_fight.mp4",
-            "media/videos/StickmanFight/720p16/stickman_fight.mp4",
-            "media/videos/1280p16/stickman_fight.mp4",  # This is the correct one!
-        ]
-        
-        video_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                video_path = path
-                print(f"📁 Output file found: {path}")
-                break
+            stream = HlsStream(StickmanFight.SECTIONS) if STREAM else None
+            if RENDITIONS:
+                report = render_renditions(status=status, profile=PROFILE, stream=stream)
+            else:
+                report = render_movie(VIDEO_PATH, status=status, profile=PROFILE, stream=stream)
+            
+            print("✅ Video rendered successfully!")
+            if report is not None:
+                print(f"⏱️ Render profile written to {profiling.REPORT_PATH}")
+                print(profiling.summary_table(report))
+            
+            outputs = rendition_outputs()
+            artifact_cache.store(key, outputs, inputs)
+            print(f"💾 Stored as {artifact_cache.ARTIFACT_DIR}/{key}")
         
-        if not video_path:
-            print("⚠️ Video rendered but file not found at expected paths")
-            # List directory contents for debugging
-            if os.path.exists("media"):
-                print("📁 Contents of media directory:")
-                for root, dirs, files in os.walk("media"):
-                    level = root.replace("media", "").count(os.sep)
-                    indent = " " * 2 * level
-                    print(f"{indent}{os.path.basename(root)}/")
-                    subindent = " " * 2 * (level + 1)
-                    for file in files:
-                        if file.endswith('.mp4'):
-                            print(f"{subindent}🎬 {file}")
+        for name, path in outputs.items():
+            print(f"📁 {name}: {path}")
+        status.finish()
         
-        # Create download page with CORRECT filename
-        with open("index.html", "w") as f:
-            f.write(f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Download Stickman Video</title>
-                <meta name="viewport" content="width=device-width, initial-scale=1">
-                <style>
-                    body {{
-                        font-family: Arial, sans-serif;
-                        text-align: center;
-                        padding: 20px;
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        color: white;
-                        min-height: 100vh;
-                        margin: 0;
-                        display: flex;
-                        justify-content: center;
-                        align-items: center;
-                    }}
-                    .container {{
-                        background: rgba(255,255,255,0.1);
-                        backdrop-filter: blur(10px);
-                        padding: 40px;
-                        border-radius: 20px;
-                        box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                        max-width: 600px;
+    except ImportError as e:
+        print(f"❌ Import error: {e}")
+        print("💡 Check that all dependencies are installed correctly")
+        status.fail(e)
+    except Exception as e:
+        print(f"❌ Error rendering video: {e}")
+        print("📋 Full traceback:")
+        traceback.print_exc()
+        status.fail(e)
+
+def write_index_page():
+    """Create download page with CORRECT filename"""
+    # Every other rendition gets its own link under the main button
+    rendition_links = "".join(
+        f'<a href="/{path}" download class="rendition">{renditions.RENDITIONS[name]["label"]}</a>'
+        for name, path in rendition_outputs().items()
+        if path != VIDEO_PATH
+    )
+    with open("index.html", "w") as f:
+        f.write(f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Download Stickman Video</title>
+            <meta name="viewport" content="width=device-width, initial-scale=1">
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    text-align: center;
+                    padding: 20px;
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    color: white;
+                    min-height: 100vh;
+                    margin: 0;
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                }}
+                .container {{
+                    background: rgba(255,255,255,0.1);
+                    backdrop-filter: blur(10px);
+                    padding: 40px;
+                    border-radius: 20px;
+                    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+                    max-width: 600px;
+                }}
+                h1 {{
+                    margin-bottom: 20px;
+                    font-size: 2em;
+                }}
+                .download-btn {{
+                    background: #4A90E2;
+                    color: white;
+                    padding: 15px 40px;
+                    text-decoration: none;
+                    border-radius: 50px;
+                    font-size: 20px;
+                    font-weight: bold;
+                    display: inline-block;
+                    margin: 20px 0;
+                    transition: transform 0.3s, box-shadow 0.3s;
+                    border: none;
+                    cursor: pointer;
+                }}
+                .download-btn:hover {{
+                    transform: translateY(-2px);
+                    box-shadow: 0 10px 30px rgba(74,144,226,0.5);
+                }}
+                .info {{
+                    margin-top: 30px;
+                    color: rgba(255,255,255,0.8);
+                    font-size: 14px;
+                }}
+                .success {{
+                    color: #4CAF50;
+                    font-size: 48px;
+                    margin-bottom: 20px;
+                }}
+                .rendition {{
+                    display: block;
+                    color: white;
+                    margin: 8px 0;
+                }}
+                video {{
+                    width: 100%;
+                    max-height: 60vh;
+                    border-radius: 12px;
+                    background: black;
+                    margin-bottom: 20px;
+                }}
+                .hidden {{
+                    display: none;
+                }}
+            </style>
+            <!-- Only used where the browser cannot play HLS itself (everything but Safari) -->
+            <script src="https://cdn.jsdelivr.net/npm/hls.js@1"></script>
+        </head>
+        <body>
+            <div class="container">
+                <div class="success" id="icon">⏳</div>
+                <h1 id="headline">Rendering Your Stickman Video...</h1>
+                <p style="font-size: 18px; margin-bottom: 30px;">
+                    "The Light Stick vs. The Bow"<br>
+                    <span style="font-size: 14px;">16 FPS | 30 Seconds | With Sound Effects</span>
+                </p>
+                <video id="player" class="hidden" controls playsinline muted></video>
+                <div id="progress" style="font-size: 16px;">Warming up the pencils...</div>
+                <a href="/media/videos/1280p16/stickman_fight.mp4" 
+                   download="stickman_fight.mp4" 
+                   class="download-btn hidden"
+                   id="download">
+                    📥 Download Video (48 animations!)
+                </a>
+                <div id="renditions" class="hidden">{rendition_links}</div>
+                <div class="info">
+                    ⚡ Video includes sound effects<br>
+                    🎬 48 animations | 8 scenes + bonus selfie<br>
+                    😂 "New aesthetic unlocked."<br>
+                    📁 Filename: stickman_fight.mp4
+                </div>
+            </div>
+            <script>
+                // Sections show up in the live playlist as they finish: start watching before the end
+                let playing = null;
+                function play(url, live) {{
+                    const player = document.getElementById("player");
+                    playing = url;
+                    player.classList.remove("hidden");
+                    if (live && !player.canPlayType("application/vnd.apple.mpegurl") &&
+                        window.Hls && Hls.isSupported()) {{
+                        const hls = new Hls();
+                        hls.loadSource(url);
+                        hls.attachMedia(player);
+                    }} else {{
+                        player.src = url;
                     }}
-                    h1 {{
-                        margin-bottom: 20px;
-                        font-size: 2em;
+                }}
+                
+                // The server answers right away and renders in the background
+                async function poll() {{
+                    let status;
+                    try {{
+                        status = await (await fetch("/status")).json();
+                    }} catch (error) {{
+                        setTimeout(poll, 2000);
+                        return;
                     }}
-                    .download-btn {{
-                        background: #4A90E2;
-                        color: white;
-                        padding: 15px 40px;
-                        text-decoration: none;
-                        border-radius: 50px;
-                        font-size: 20px;
-                        font-weight: bold;
-                        display: inline-block;
-                        margin: 20px 0;
-                        transition: transform 0.3s, box-shadow 0.3s;
-                        border: none;
-                        cursor: pointer;
+                    const progress = document.getElementById("progress");
+                    if (status.stream && !playing) {{
+                        play(status.stream, true);
                     }}
-                    .download-btn:hover {{
-                        transform: translateY(-2px);
-                        box-shadow: 0 10px 30px rgba(74,144,226,0.5);
+                    if (status.state === "done") {{
+                        if (!playing) {{
+                            play("/{VIDEO_PATH}", false);
+                        }}
+                        document.getElementById("icon").textContent = "✅";
+                        document.getElementById("headline").textContent = "Your Stickman Video is Ready!";
+                        document.getElementById("download").classList.remove("hidden");
+                        document.getElementById("renditions").classList.remove("hidden");
+                        progress.classList.add("hidden");
+                        return;
                     }}
-                    .info {{
-                        margin-top: 30px;
-                        color: rgba(255,255,255,0.8);
-                        font-size: 14px;
+                    if (status.state === "failed") {{
+                        document.getElementById("icon").textContent = "❌";
+                        progress.textContent = "Render failed: " + status.error;
+                        return;
                     }}
-                    .success {{
-                        color: #4CAF50;
-                        font-size: 48px;
-                        margin-bottom: 20px;
+                    if (status.animations_total) {{
+                        const eta = status.eta_seconds === null ? "" : " | ~" + Math.ceil(status.eta_seconds) + "s left";
+                        progress.textContent = status.animations_done + "/" + status.animations_total +
+                            " animations | " + status.frames_written + " frames" + eta;
                     }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="success">✅</div>
-                    <h1>Your Stickman Video is Ready!</h1>
-                    <p style="font-size: 18px; margin-bottom: 30px;">
-                        "The Light Stick vs. The Bow"<br>
-                        <span style="font-size: 14px;">16 FPS | 30 Seconds | With Sound Effects</span>
-                    </p>
-                    <a href="/media/videos/1280p16/stickman_fight.mp4" 
-                       download="stickman_fight.mp4" 
-                       class="download-btn">
-                        📥 Download Video (48 animations!)
-                    </a>
-                    <div class="info">
-                        ⚡ Video includes sound effects<br>
-                        🎬 48 animations | 8 scenes + bonus selfie<br>
-                        😂 "New aesthetic unlocked."<br>
-                        📁 Filename: stickman_fight.mp4
-                    </div>
-                </div>
-            </body>
-            </html>
-            """)
-        
+                    setTimeout(poll, 2000);
+                }}
+                poll();
+            </script>
+        </body>
+        </html>
+        """)
+
+def render_video():
+    """Serve right away and render the animation in the background"""
+    try:
+        write_index_page()
         print("✅ Download page created: index.html")
+        
+        status = RenderStatus()
+        threading.Thread(target=render_in_background, args=(status,), daemon=True).start()
+        jobs = RenderJobs(render_variant, workers=RENDER_API_WORKERS, max_queued=RENDER_QUEUE_SIZE)
+        
         print("🌐 Starting web server on port 10000...")
-        print(f"🎬 Video path: /media/videos/1280p16/stickman_fight.mp4")
+        print(f"🎬 Video path: /{VIDEO_PATH}")
+        print("📊 Render progress: /status")
+        print("🎨 Custom renders: POST /render, then GET /jobs/<id>")
         
-        # Start a simple HTTP server to serve the video
+        # Start a threaded HTTP server to serve the video, one thread per visitor
         PORT = 10000
-        Handler = http.server.SimpleHTTPRequestHandler
+        Handler = partial(VideoRequestHandler, status=status, jobs=jobs)
         
-        with socketserver.TCPServer(("", PORT), Handler) as httpd:
+        with http.server.ThreadingHTTPServer(("", PORT), Handler) as httpd:
             print(f"🚀 Server running at http://0.0.0.0:{PORT}")
-            print("✅ Video available for download!")
             httpd.serve_forever()
         
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
-        print("💡 Check that all dependencies are installed correctly")
-        sys.exit(1)
     except Exception as e:
-        print(f"❌ Error rendering video: {e}")
+        print(f"❌ Error starting server: {e}")
         print("📋 Full traceback:")
         traceback.print_exc()
         sys.exit(1)
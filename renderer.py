@@ -0,0 +1,306 @@
+"""Cairo renderer and file writer tuned for the stickman videos"""
+import math
+import os
+import subprocess
+import zlib
+from contextlib import nullcontext
+
+import numpy as np
+from manim import __version__, config
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim.utils.family import extract_mobject_family_members
+from manim.utils.file_ops import is_webm_format, write_to_movie
+
+import segment_cache
+from frame_queue import FrameQueue
+
+# Style attributes that change how a static layer mobject looks
+LAYER_STYLE = ("fill_rgbas", "stroke_rgbas", "stroke_width")
+
+# Plays this many frames long or shorter share one encoder stream with their
+# neighbours (the 0.08s tugs and nudges); 0 turns merging off
+MERGE_FRAMES = float(os.environ.get("STICKMAN_MERGE_FRAMES", "2"))
+
+# libx264 settings of the partial movies, x264's own defaults unless the caller
+# (render_video.ENCODER) says otherwise; None leaves a setting to x264
+ENCODER = {"preset": "medium", "crf": 23, "tune": None, "threads": 0, "keyint": None}
+
+def x264_args(encoder):
+    """ffmpeg output options for an ENCODER-style dict"""
+    options = {"preset": "-preset", "crf": "-crf", "tune": "-tune", "threads": "-threads", "keyint": "-g"}
+    args = []
+    for key, flag in options.items():
+        if encoder.get(key) is not None:
+            args += [flag, str(encoder[key])]
+    return args
+
+
+class StickmanFileWriter(SceneFileWriter):
+    """Partial movie writer whose cache keys also cover the wiggle seed"""
+
+    def __init__(self, *args, **kwargs):
+        # Open stream shared by a run of short plays, see add_partial_movie_file
+        self.merged = None
+        self.frame_queue = FrameQueue()
+        super().__init__(*args, **kwargs)
+
+    def add_partial_movie_file(self, hash_animation):
+        if hash_animation is not None and self.renderer.is_short_play():
+            if self.merged is not None:
+                # Continue the open stream, no partial movie of its own
+                return super().add_partial_movie_file(None)
+            # Uncached, so the name only has to be unique among concurrent renders
+            name = f"{segment_cache.MERGED_PREFIX}{os.getpid()}_{self.renderer.scene.cache_salt}"
+            super().add_partial_movie_file(name)
+            section = self.sections[-1]
+            self.merged = {
+                "index": len(self.partial_movie_files) - 1,
+                "section": section,
+                "section_index": len(section.partial_movie_files) - 1,
+                "open": False,
+            }
+            return None
+        self.close_merged()
+        super().add_partial_movie_file(self.salt(hash_animation))
+
+    def is_already_cached(self, hash_invocation):
+        # A merged stream holds several plays, so no single hash can name it
+        if self.renderer.is_short_play():
+            return False
+        return super().is_already_cached(self.salt(hash_invocation))
+
+    def salt(self, hash_animation):
+        # manim hashes the mobjects, but not the RNG stream their updaters draw from,
+        # nor the encoder settings (segments must match to be concatenated losslessly)
+        if hash_animation is None or hash_animation.startswith("uncached_"):
+            return hash_animation
+        return f"{hash_animation}_{self.renderer.scene.cache_salt}_{self.renderer.encoder_tag}"
+
+    def begin_animation(self, allow_write=False, file_path=None):
+        if self.merged is not None:
+            if self.merged["open"]:
+                return
+            self.merged["open"] = allow_write and write_to_movie()
+            self.merged["frames_before"] = self.renderer.frames_written
+        super().begin_animation(allow_write, file_path)
+
+    def end_animation(self, allow_write=False):
+        # A merged stream stays open for the next short play
+        if self.merged is None:
+            super().end_animation(allow_write)
+
+    def close_merged(self):
+        """Finish the stream of a run of short plays"""
+        merged, self.merged = self.merged, None
+        if merged is None or not merged["open"]:
+            return
+        super().end_animation(allow_write=True)
+        if self.renderer.frames_written == merged["frames_before"]:
+            # None of the plays reached a frame on the grid: drop the empty movie
+            os.remove(self.partial_movie_files[merged["index"]])
+            self.partial_movie_files[merged["index"]] = None
+            merged["section"].partial_movie_files[merged["section_index"]] = None
+
+    def next_section(self, *args, **kwargs):
+        self.close_merged()
+        self.section_finished()
+        super().next_section(*args, **kwargs)
+
+    def finish(self):
+        self.close_merged()
+        self.section_finished()
+        super().finish()
+
+    def section_finished(self):
+        """Hand the partial movies of the section just closed to the renderer's on_section"""
+        on_section = self.renderer.on_section
+        if on_section is None or not self.sections or self.sections[-1].skip_animations:
+            return
+        section = self.sections[-1]
+        on_section(section.name, section.get_clean_partial_movie_files())
+
+    def open_movie_pipe(self, file_path=None):
+        # Encode under a private name: concurrent renders share the segment cache,
+        # and another one may be checking for or writing the same segment
+        if file_path is None:
+            file_path = self.partial_movie_files[self.renderer.num_plays]
+        self.segment_path = file_path
+        root, ext = os.path.splitext(file_path)
+        self.partial_movie_file_path = f"{root}.{os.getpid()}.tmp{ext}"
+        with self.renderer.timed("encode"):
+            self.writing_process = subprocess.Popen(
+                self.ffmpeg_command(self.partial_movie_file_path), stdin=subprocess.PIPE
+            )
+        self.frame_queue.open(self.writing_process.stdin)
+
+    def ffmpeg_command(self, file_path):
+        """manim's rawvideo-to-movie command, with the renderer's encoder settings"""
+        fps = config.frame_rate
+        if fps == int(fps):
+            fps = int(fps)
+        command = [
+            config.ffmpeg_executable, "-y",
+            "-f", "rawvideo", "-s", f"{config.pixel_width}x{config.pixel_height}",
+            "-pix_fmt", "rgba", "-r", str(fps), "-i", "-",
+            "-an", "-loglevel", config.ffmpeg_loglevel.lower(),
+            "-metadata", f"comment=Rendered with Manim Community v{__version__}",
+        ]
+        if is_webm_format():
+            command += ["-vcodec", "libvpx-vp9", "-auto-alt-ref", "0"]
+        elif config.transparent:
+            command += ["-vcodec", "qtrle"]
+        else:
+            command += ["-vcodec", "libx264", "-pix_fmt", "yuv420p"] + x264_args(self.renderer.encoder)
+        return command + [file_path]
+
+    def write_frame(self, frame_or_renderer, num_frames=1):
+        # Only blocks (and so only costs encode time) while the encoder is behind
+        with self.renderer.timed("encode"):
+            if self.frame_queue.is_open:
+                self.frame_queue.put(frame_or_renderer, num_frames)
+                return
+            for _ in range(num_frames):
+                super().write_frame(frame_or_renderer)
+
+    def close_movie_pipe(self):
+        # Waits for the queue to drain and ffmpeg to flush, so it is encode time too
+        with self.renderer.timed("encode"):
+            error = self.frame_queue.close()
+            super().close_movie_pipe()
+        if error is not None:
+            raise error
+        os.replace(self.partial_movie_file_path, self.segment_path)
+        self.partial_movie_file_path = self.segment_path
+
+    def combine_to_movie(self):
+        # Section workers leave stitching to render_video
+        if not self.renderer.defer_combine:
+            super().combine_to_movie()
+
+    def clean_cache(self):
+        if not self.renderer.defer_combine:
+            segment_cache.evict(self.partial_movie_directory)
+
+
+class StickmanRenderer(CairoRenderer):
+    def __init__(self, file_writer_class=StickmanFileWriter, defer_combine=False, profile=None,
+                 merge_frames=MERGE_FRAMES, encoder=None, on_section=None, **kwargs):
+        # When True, partial movies are left for the caller to stitch and evict
+        self.defer_combine = defer_combine
+        # Called with (name, partial movies) as each rendered section is closed
+        self.on_section = on_section
+        # Optional profiling.RenderProfile collecting per-play timings
+        self.profile = profile
+        self.frames_written = 0
+        # Rasterized static layer (see StickmanFight.mark_static) and what it showed
+        self.layer_image = None
+        self.layer_key = None
+        self.merge_frames = merge_frames
+        self.encoder = {**ENCODER, **(encoder or {})}
+        self.encoder_tag = f"{zlib.crc32(repr(sorted(self.encoder.items())).encode()):08x}"
+        # Exact position on the timeline; self.time only counts written frames
+        self.clock = 0.0
+        super().__init__(file_writer_class=file_writer_class, **kwargs)
+
+    def init_scene(self, scene):
+        self.scene = scene
+        super().init_scene(scene)
+
+    def play(self, scene, *args, **kwargs):
+        super().play(scene, *args, **kwargs)
+        self.clock += scene.duration
+
+    def frame_times(self, run_time):
+        """Times into the current play of the frames on the video's 1/fps grid
+
+        Sampling one global grid, instead of restarting at 0 every play, keeps
+        short plays from each rounding up to whole extra frames.
+        """
+        dt = 1 / config.frame_rate
+        first = math.ceil(self.clock / dt - 1e-6)
+        last = math.ceil((self.clock + run_time) / dt - 1e-6)
+        return np.maximum(np.arange(first, last) * dt - self.clock, 0)
+
+    def grid_offset(self):
+        """How far into a play starting now its first frame falls"""
+        dt = 1 / config.frame_rate
+        return max(math.ceil(self.clock / dt - 1e-6) * dt - self.clock, 0)
+
+    def is_short_play(self):
+        """Whether the current play is short enough to share an encoder stream"""
+        return self.scene.duration * config.frame_rate <= self.merge_frames
+
+    def freeze_current_frame(self, duration):
+        self.add_frame(self.get_frame(), num_frames=len(self.frame_times(duration)))
+
+    def update_frame(self, scene, *args, **kwargs):
+        # Fast-forwarded and cached plays never reach the movie, don't rasterize them
+        if self.skip_animations:
+            return
+        with self.timed("rasterize"):
+            super().update_frame(scene, *args, **kwargs)
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        # Start from the cached static layer instead of a blank frame, so only
+        # what is static for just this play gets rasterized again
+        self.static_image = None
+        if self.skip_animations:
+            return None
+        layer = scene.static_layer_mobjects()
+        if not layer:
+            return super().save_static_frame_data(scene, static_mobjects)
+
+        self.static_image = self.static_layer_image(scene, layer)
+        layer_family = set(extract_mobject_family_members(layer))
+        rest = [mobject for mobject in static_mobjects if mobject not in layer_family]
+        if rest:
+            self.update_frame(scene, mobjects=rest)
+            self.static_image = self.get_frame()
+        return self.static_image
+
+    def static_layer_image(self, scene, layer):
+        """The static layer rasterized on the background, redrawn only when it changed"""
+        key = layer_key(layer)
+        if key != self.layer_key:
+            self.static_image = None
+            self.update_frame(scene, mobjects=layer)
+            self.layer_image = self.get_frame()
+            self.layer_key = key
+        return self.layer_image
+
+    def render(self, scene, time, moving_mobjects):
+        # The frame queue copies the pixels into its own buffer, no need for get_frame's copy
+        self.update_frame(scene, moving_mobjects)
+        self.add_frame(self.camera.pixel_array)
+
+    def get_frame(self):
+        with self.timed("rasterize"):
+            return super().get_frame()
+
+    def add_frame(self, frame, num_frames=1):
+        if self.skip_animations:
+            return
+        self.frames_written += num_frames
+        self.time += num_frames / self.camera.frame_rate
+        # One queued frame for a whole freeze, not num_frames copies
+        self.file_writer.write_frame(frame, num_frames)
+
+    def timed(self, stage):
+        """Charge the enclosed work to a profiling stage, when profiling"""
+        if self.profile is None:
+            return nullcontext()
+        return self.profile.time(stage)
+
+
+
+def layer_key(mobjects):
+    """Everything about the mobjects that shows up in a rasterized frame"""
+    return tuple(
+        (
+            id(mobject),
+            mobject.points.tobytes(),
+            *(np.asarray(getattr(mobject, name, 0)).tobytes() for name in LAYER_STYLE),
+        )
+        for mobject in extract_mobject_family_members(mobjects)
+    )
@@ -0,0 +1,144 @@
+"""Every rendition of the video (sizes, WebM, looping teasers) from one master, in one ffmpeg pass"""
+import os
+import subprocess
+
+RENDITION_DIR = os.path.join("media", "videos", "renditions")
+
+# The master is rendered once, at the largest size asked for, then scaled down
+RENDITIONS = {
+    "1080p": {"width": 1080, "height": 1920, "ext": "mp4", "label": "1080x1920 MP4 (upload)"},
+    "720p": {"width": 720, "height": 1280, "ext": "mp4", "label": "720x1280 MP4 (phones)"},
+    "480p": {"width": 480, "height": 854, "ext": "mp4", "label": "480x854 MP4 (low bandwidth)"},
+    "webm": {"width": 720, "height": 1280, "ext": "webm", "label": "720x1280 WebM"},
+    # Smooth deliverables made from the 16 fps master instead of rendering 2-4x the frames
+    "720p30": {
+        "width": 720, "height": 1280, "ext": "mp4", "fps": 30, "interpolate": "blend",
+        "label": "720x1280 MP4, 30 fps",
+    },
+    "720p60": {
+        "width": 720, "height": 1280, "ext": "mp4", "fps": 60, "interpolate": "mci", "blur": 2,
+        "label": "720x1280 MP4, 60 fps",
+    },
+    "teaser_gif": {"width": 270, "height": 480, "ext": "gif", "seconds": 4, "fps": 10, "label": "Looping GIF teaser"},
+    "teaser_webp": {"width": 360, "height": 640, "ext": "webp", "seconds": 4, "fps": 12, "label": "Looping WebP teaser"},
+}
+
+# ffmpeg output options per container
+CODECS = {
+    "mp4": [
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-tune", "animation",
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+    ],
+    "webm": ["-c:v", "libvpx-vp9", "-crf", "33", "-b:v", "0", "-row-mt", "1", "-cpu-used", "4"],
+    "gif": ["-loop", "0"],
+    "webp": ["-c:v", "libwebp", "-loop", "0", "-q:v", "70"],
+}
+
+
+def parse_names(value):
+    """Rendition names from a comma separated list, e.g. STICKMAN_RENDITIONS"""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in RENDITIONS]
+    if unknown:
+        raise ValueError(f"Unknown rendition(s): {', '.join(unknown)} (known: {', '.join(RENDITIONS)})")
+    return names
+
+
+def master_size(names):
+    """(width, height) to render at so that every rendition is a downscale"""
+    return (
+        max(RENDITIONS[name]["width"] for name in names),
+        max(RENDITIONS[name]["height"] for name in names),
+    )
+
+
+def rendition_path(name, directory=RENDITION_DIR):
+    return os.path.join(directory, f"stickman_fight_{name}.{RENDITIONS[name]['ext']}")
+
+
+def interpolate_filters(spec):
+    """Filters making spec["fps"] frames a second out of the master's, in between ones included
+
+    "blend" crossfades neighbouring frames, "mci" moves the pixels along their
+    estimated motion (slower, but edges stay sharp). With "blur": N, every
+    output frame averages N interpolated ones: static pixels stay as they are,
+    fast moves like the arrow shots smear along their path, like a real shutter.
+    """
+    options = {"fps": spec["fps"], "mi_mode": spec["interpolate"]}
+    if spec["interpolate"] == "mci":
+        # Overlapped blocks, searched both ways; hard cuts are repeated, not morphed
+        options.update(mc_mode="aobmc", me_mode="bidir", scd="fcount")
+    filters = ["minterpolate=" + ":".join(f"{key}={value}" for key, value in options.items())]
+    if spec.get("blur", 1) > 1:
+        filters.append(f"tmix=frames={spec['blur']}")
+    return filters
+
+
+def filter_graph(names):
+    """Split the decoded master once and scale (and trim, for teasers) each branch"""
+    graph = [f"[0:v]split={len(names)}" + "".join(f"[in{i}]" for i in range(len(names)))]
+    for i, name in enumerate(names):
+        spec = RENDITIONS[name]
+        chain = []
+        if "seconds" in spec:
+            chain += [f"trim=duration={spec['seconds']}", "setpts=PTS-STARTPTS"]
+        if "interpolate" in spec:
+            # Motion search costs per pixel: scale down before it, not after
+            chain.append(f"scale={spec['width']}:{spec['height']}:flags=lanczos")
+            chain += interpolate_filters(spec)
+        else:
+            if "fps" in spec:
+                chain.append(f"fps={spec['fps']}")
+            chain.append(f"scale={spec['width']}:{spec['height']}:flags=lanczos")
+        if spec["ext"] == "gif":
+            # A palette made for this clip instead of the generic 256 colors
+            graph.append(f"[in{i}]{','.join(chain)},split[gif{i}][palette_in{i}]")
+            graph.append(f"[palette_in{i}]palettegen=stats_mode=diff[palette{i}]")
+            graph.append(f"[gif{i}][palette{i}]paletteuse=dither=bayer[out{i}]")
+        else:
+            graph.append(f"[in{i}]{','.join(chain)}[out{i}]")
+    return ";".join(graph)
+
+
+def is_master_copy(name, size):
+    """Whether rendition name is the master as rendered: an MP4 of every frame, at its size"""
+    spec = RENDITIONS[name]
+    return (
+        (spec["width"], spec["height"]) == tuple(size) and spec["ext"] == "mp4"
+        and not any(key in spec for key in ("fps", "seconds", "interpolate"))
+    )
+
+
+def encode(master_path, outputs, size=None):
+    """Encode {name: path} renditions of master_path, decoding it only once
+
+    Renditions the master already is (see is_master_copy, given the master's
+    (width, height) as size) are hard-linked to it instead of re-encoded.
+    Every output is written next to its target and swapped in at the end, so
+    nobody downloads half a file.
+    """
+    from manim import config
+
+    from artifact_cache import link_or_copy
+
+    copies = [name for name in outputs if size is not None and is_master_copy(name, size)]
+    names = [name for name in outputs if name not in copies]
+    command = [
+        config.ffmpeg_executable, "-y", "-nostdin", "-loglevel", "error",
+        "-i", master_path, "-filter_complex", filter_graph(names),
+    ]
+    tmp_paths = {}
+    for name in outputs:
+        root, ext = os.path.splitext(outputs[name])
+        tmp_paths[name] = f"{root}.tmp{ext}"
+        os.makedirs(os.path.dirname(outputs[name]) or ".", exist_ok=True)
+    for name in copies:
+        link_or_copy(master_path, tmp_paths[name])
+    for i, name in enumerate(names):
+        command += ["-map", f"[out{i}]", "-an"] + CODECS[RENDITIONS[name]["ext"]] + [tmp_paths[name]]
+    if names:
+        subprocess.run(command, check=True)
+
+    for name, tmp_path in tmp_paths.items():
+        os.replace(tmp_path, outputs[name])
+    return outputs
@@ -0,0 +1,277 @@
+"""Skeletal stickman: joint angles and bone lengths, posed by batched forward kinematics"""
+import numpy as np
+from manim import ORIGIN, OUT, Animation, Circle, VGroup, VMobject
+from manim.utils.paths import straight_path
+
+from stickman import HIP, POSES, SHOULDER
+
+# Bones in parent-before-child order, -1 hangs the bone off the hip (the root)
+BONES = (
+    ("spine", -1),  # hip -> shoulders
+    ("neck", 0),  # shoulders -> top of the body line
+    ("head", 1),  # -> centre of the head
+    ("left_upper_arm", 0),
+    ("left_forearm", 3),
+    ("right_upper_arm", 0),
+    ("right_forearm", 5),
+    ("left_thigh", -1),
+    ("left_shin", 7),
+    ("right_thigh", -1),
+    ("right_shin", 9),
+)
+BONE = {name: i for i, (name, _) in enumerate(BONES)}
+PARENTS = tuple(parent for _, parent in BONES)
+
+# Limbs drawn as two-segment polylines: (first bone, second bone)
+LIMBS = (
+    (BONE["left_upper_arm"], BONE["left_forearm"]),
+    (BONE["right_upper_arm"], BONE["right_forearm"]),
+    (BONE["left_thigh"], BONE["left_shin"]),
+    (BONE["right_thigh"], BONE["right_shin"]),
+)
+
+HEAD_RADIUS = 0.28
+FEET = (HIP + np.array([-0.3, -0.6, 0]), HIP + np.array([0.3, -0.6, 0]))
+
+
+def forward_kinematics(roots, angles, lengths):
+    """Bone start and end points for N characters in one batched pass
+
+    roots is (N, 2) hip positions, angles and lengths are (N, len(BONES)).
+    Angles are relative to the parent bone, or to the x axis for bones on the
+    hip. Returns (starts, ends), each (N, len(BONES), 2).
+    """
+    roots = np.asarray(roots, dtype=float)
+    count = len(roots)
+    absolute = np.empty((count, len(BONES)))
+    starts = np.empty((count, len(BONES), 2))
+    ends = np.empty((count, len(BONES), 2))
+    for bone, parent in enumerate(PARENTS):
+        if parent < 0:
+            absolute[:, bone] = angles[:, bone]
+            starts[:, bone] = roots
+        else:
+            absolute[:, bone] = absolute[:, parent] + angles[:, bone]
+            starts[:, bone] = ends[:, parent]
+        ends[:, bone, 0] = starts[:, bone, 0] + lengths[:, bone] * np.cos(absolute[:, bone])
+        ends[:, bone, 1] = starts[:, bone, 1] + lengths[:, bone] * np.sin(absolute[:, bone])
+    return starts, ends
+
+
+def segment_points(starts, ends):
+    """Cubic Bézier control points of straight segments, (..., 2) -> (..., 4, 3)"""
+    points = np.zeros(starts.shape[:-1] + (4, 3))
+    for i, t in enumerate((0, 1 / 3, 2 / 3, 1)):
+        points[..., i, :2] = starts + (ends - starts) * t
+    return points
+
+
+def limb_pose(angles, lengths, parent_angle, joint, reach):
+    """Set a two-bone limb straight out from joint to joint + reach"""
+    first, second = joint
+    angles[first] = np.arctan2(reach[1], reach[0]) - parent_angle
+    angles[second] = 0
+    lengths[first] = lengths[second] = np.hypot(reach[0], reach[1]) / 2
+
+
+def pose_arrays(pose):
+    """(angles, lengths) of one of stickman.POSES, matching its baked template"""
+    left_hand, right_hand = POSES.get(pose, POSES["neutral"])
+    angles = np.zeros(len(BONES))
+    lengths = np.zeros(len(BONES))
+
+    angles[BONE["spine"]] = np.pi / 2
+    lengths[BONE["spine"]] = SHOULDER[1] - HIP[1]
+    lengths[BONE["neck"]] = 0.2
+    lengths[BONE["head"]] = 0.3
+
+    limb_pose(angles, lengths, np.pi / 2, LIMBS[0], left_hand - SHOULDER)
+    limb_pose(angles, lengths, np.pi / 2, LIMBS[1], right_hand - SHOULDER)
+    limb_pose(angles, lengths, 0, LIMBS[2], FEET[0] - HIP)
+    limb_pose(angles, lengths, 0, LIMBS[3], FEET[1] - HIP)
+    return angles, lengths
+
+
+def walk_pose(phase, base="neutral", stride=0.45, knee=0.6, swing=0.5):
+    """(angles, lengths) of a walk cycle at phase radians, one stride per pi"""
+    angles, lengths = pose_arrays(base)
+    step = np.sin(phase)
+    for (thigh, shin), side in zip(LIMBS[2:], (1, -1)):
+        angles[thigh] = -np.pi / 2 + side * stride * step
+        # Only the leg swinging forward bends its knee
+        angles[shin] = -knee * max(side * np.cos(phase), 0)
+    for (upper, forearm), side in zip(LIMBS[:2], (-1, 1)):
+        angles[upper] = np.pi + side * swing * step
+        angles[forearm] = 0.3 * side
+    return angles, lengths
+
+
+def punch_pose(base="ready", reach=1.0):
+    """(angles, lengths) with the right arm thrown straight out"""
+    angles, lengths = pose_arrays(base)
+    limb_pose(angles, lengths, np.pi / 2, LIMBS[1], np.array([reach, 0.05]))
+    return angles, lengths
+
+
+def wrap_angles(angles):
+    """Map to [-pi, pi), so poses blend along the short way round"""
+    return (angles + np.pi) % (2 * np.pi) - np.pi
+
+
+class StickmanRig(VGroup):
+    """Stickman drawn from a skeleton, posed by joint angles instead of moving points
+
+    Same six parts as stickman.pose_template (head, body, arms, legs), but each
+    pose is written into the existing point arrays by forward kinematics.
+    """
+
+    def __init__(self, color, position, pose="neutral", stroke_width=6, wiggle=0.02, rng=None, **kwargs):
+        head = Circle(radius=HEAD_RADIUS, color=color, stroke_width=stroke_width)
+        body = VMobject(color=color, stroke_width=stroke_width).set_points(np.zeros((4, 3)))
+        limbs = [
+            VMobject(color=color, stroke_width=stroke_width - 1).set_points(np.zeros((8, 3)))
+            for _ in LIMBS
+        ]
+        super().__init__(head, body, *limbs, **kwargs)
+        self.outline = head.points - head.get_center()
+
+        # The rig hangs off the hip, stickman.pose_template is laid out around position
+        self.root = np.array(position[:2], dtype=float) + HIP[:2]
+        self.angles, self.lengths = pose_arrays(pose)
+        # Fixed hand-drawn wobble, re-applied on top of every pose
+        self.wiggle = np.zeros((sum(len(m.points) for m in self.family_members_with_points()), 3))
+        if rng is not None:
+            self.wiggle[:, :2] = rng.uniform(-wiggle, wiggle, (len(self.wiggle), 2))
+        self.apply_pose()
+
+    def set_pose(self, root=None, angles=None, lengths=None):
+        if root is not None:
+            self.root = np.asarray(root, dtype=float)
+        if angles is not None:
+            self.angles = np.asarray(angles, dtype=float)
+        if lengths is not None:
+            self.lengths = np.asarray(lengths, dtype=float)
+        return self.apply_pose()
+
+    def apply_pose(self):
+        starts, ends = forward_kinematics(self.root[None], self.angles[None], self.lengths[None])
+        return self.write_pose(starts[0], ends[0])
+
+    def write_pose(self, starts, ends):
+        """Write joint positions from forward_kinematics into the point arrays, in place"""
+        head, body, *limbs = self.submobjects
+        head.points[:] = self.outline
+        head.points[:, :2] += ends[BONE["head"]]
+        body.points[:] = segment_points(starts[BONE["spine"]], ends[BONE["neck"]])
+        for limb, (first, second) in zip(limbs, LIMBS):
+            limb.points[:4] = segment_points(starts[first], ends[first])
+            limb.points[4:] = segment_points(starts[second], ends[second])
+
+        start = 0
+        for member in self.family_members_with_points():
+            member.points += self.wiggle[start:start + len(member.points)]
+            start += len(member.points)
+        return self
+
+    # Keep the skeleton in step with the usual whole-body moves
+
+    def shift(self, *vectors):
+        super().shift(*vectors)
+        self.root = self.root + np.sum(vectors, axis=0)[:2]
+        return self
+
+    def rotate(self, angle, axis=OUT, about_point=None, about_edge=ORIGIN, **kwargs):
+        if about_point is None:
+            about_point = self.get_critical_point(about_edge)
+        super().rotate(angle, axis=axis, about_point=about_point, **kwargs)
+        if axis[0] == axis[1] == 0:
+            # Turning in the picture plane: swing the hip round, tilt the hip's bones
+            angle *= np.sign(axis[2])
+            pivot = np.asarray(about_point)[:2]
+            cos, sin = np.cos(angle), np.sin(angle)
+            x, y = self.root - pivot
+            self.root = pivot + [cos * x - sin * y, sin * x + cos * y]
+            self.angles = self.angles + [angle if parent < 0 else 0 for parent in PARENTS]
+            # Turn the head outline and the wobble with it, so the next pose is drawn tilted too
+            turn = np.array([[cos, sin], [-sin, cos]])
+            self.outline = self.outline.copy()
+            self.outline[:, :2] = self.outline[:, :2] @ turn
+            self.wiggle = self.wiggle.copy()
+            self.wiggle[:, :2] = self.wiggle[:, :2] @ turn
+        return self
+
+    def interpolate(self, mobject1, mobject2, alpha, path_func=straight_path()):
+        super().interpolate(mobject1, mobject2, alpha, path_func)
+        if isinstance(mobject1, StickmanRig) and isinstance(mobject2, StickmanRig):
+            self.root = mobject1.root + (mobject2.root - mobject1.root) * alpha
+            self.angles = mobject1.angles + wrap_angles(mobject2.angles - mobject1.angles) * alpha
+            self.lengths = mobject1.lengths + (mobject2.lengths - mobject1.lengths) * alpha
+        return self
+
+
+class Repose(Animation):
+    """Blend a StickmanRig into a pose through its joint angles, not its Bézier points"""
+
+    def __init__(self, rig, pose, shift=None, **kwargs):
+        # pose is a stickman.POSES name or an (angles, lengths) pair
+        self.target_angles, self.target_lengths = pose_arrays(pose) if isinstance(pose, str) else pose
+        self.shift_by = np.zeros(2) if shift is None else np.asarray(shift, dtype=float)[:2]
+        super().__init__(rig, **kwargs)
+
+    def create_starting_mobject(self):
+        # The skeleton arrays are all we interpolate from, no need to deep copy
+        return self.mobject
+
+    def begin(self):
+        rig = self.mobject
+        self.start = (rig.root.copy(), rig.angles.copy(), rig.lengths.copy())
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.rate_func(alpha)
+        root, angles, lengths = self.start
+        self.mobject.set_pose(
+            root + self.shift_by * t,
+            angles + wrap_angles(self.target_angles - angles) * t,
+            lengths + (self.target_lengths - lengths) * t
+        )
+
+
+class Walk(Animation):
+    """Walk a StickmanRig by shift, swinging arms and legs through a walk cycle
+
+    The walk sets off from the rig's pose as it stands and ends in base, both
+    at the rig's current tilt: the gap between the cycle and those two poses
+    fades from one end of the walk to the other instead of snapping.
+    """
+
+    def __init__(self, rig, shift, strides=4, base="neutral", **kwargs):
+        self.shift_by = np.asarray(shift, dtype=float)[:2]
+        self.strides = strides
+        self.base = base
+        super().__init__(rig, **kwargs)
+
+    def create_starting_mobject(self):
+        return self.mobject
+
+    def begin(self):
+        rig = self.mobject
+        self.start = rig.root.copy()
+        tilt = wrap_angles(rig.angles[BONE["spine"]] - np.pi / 2)
+        end_angles, end_lengths = pose_arrays(self.base)
+        end_angles = end_angles + [tilt if parent < 0 else 0 for parent in PARENTS]
+        first_angles, first_lengths = walk_pose(0, self.base)
+        last_angles, last_lengths = walk_pose(np.pi * self.strides, self.base)
+        self.start_offset = (wrap_angles(rig.angles - first_angles), rig.lengths - first_lengths)
+        self.end_offset = (wrap_angles(end_angles - last_angles), end_lengths - last_lengths)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.rate_func(alpha)
+        angles, lengths = walk_pose(np.pi * self.strides * t, self.base)
+        (start_angles, start_lengths), (end_angles, end_lengths) = self.start_offset, self.end_offset
+        self.mobject.set_pose(
+            self.start + self.shift_by * t,
+            angles + start_angles * (1 - t) + end_angles * t,
+            lengths + start_lengths * (1 - t) + end_lengths * t
+        )
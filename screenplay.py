@@ -0,0 +1,376 @@
+"""Screenplays: characters, beats, dialogue and effects in a JSON (or YAML) file instead of construct()
+
+    python screenplay.py screenplays/duel.json              # render, reusing unchanged beats
+    python screenplay.py screenplays/duel.json --dry-run    # only show which beats would render
+
+A screenplay is compiled onto ScreenplayScene (main.py), one section per beat:
+
+    {
+      "video": {"fps": 16, "width": 720, "height": 1280},
+      "characters": {
+        "blue": {"color": "#4169E1", "position": [-3.5, -0.5], "pose": "ready"},
+        "yellow": {"color": "#FFA500", "position": [3.5, -0.5], "pose": "calm"}
+      },
+      "beats": [
+        {"name": "standoff", "actions": [
+          {"say": "blue", "text": "This ends now.", "hold": 0.8},
+          {"shoot": "yellow", "at": "blue"},
+          {"move": "blue", "by": [3, 0], "walk": true, "run_time": 1},
+          {"pose": "blue", "to": "neutral"},
+          {"think": "yellow", "text": "...Okay."},
+          {"wait": 0.5}
+        ]}
+      ]
+    }
+
+Every beat starts from the cast's state left by the beats before it, so its
+look depends only on its own actions, that state, where it falls on the
+frame grid and the sources. Those make up its key: a beat whose key has a
+movie from an earlier render is reused from disk, only the others render.
+Movies of earlier versions are kept for a while too, so a beat changed back
+comes off disk as well.
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+
+import artifact_cache
+import segment_cache
+
+SCREENPLAY_DIR = os.path.join("media", "screenplays")
+MANIFEST = "manifest.json"
+# Movies of beats no longer in the screenplay kept around, most recently used first
+BEAT_HISTORY = 32
+
+DEFAULT_VIDEO = {"fps": 16, "width": 720, "height": 1280}
+ARROWS = ("normal", "suction")
+MAX_TEXT_LENGTH = 80
+
+# Every action: its verb key, then optional fields with their defaults
+ACTIONS = {
+    "wait": {},
+    "say": {"text": None, "write": 0.5, "hold": 0.8, "bold": False},
+    "think": {"text": None, "write": 0.5, "hold": 0.8},
+    "pose": {"to": None, "run_time": 0.3},
+    "move": {"by": None, "run_time": 0.4, "walk": False, "motion_lines": False},
+    "shoot": {"at": None, "arrow": "normal", "run_time": 0.15, "impact": True},
+}
+
+
+def load(path):
+    """The raw screenplay in path, JSON or (with PyYAML installed) YAML"""
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML screenplays need PyYAML (pip install pyyaml), or write it as JSON")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def normalize(raw):
+    """Validated screenplay with every default filled in, ValueError if anything is off"""
+    from render_jobs import COLOR_RE, is_int
+    from stickman import POSES
+
+    if not isinstance(raw, dict):
+        raise ValueError("a screenplay must be an object")
+    unknown = set(raw) - {"video", "characters", "beats", "ground"}
+    if unknown:
+        raise ValueError(f"unknown screenplay keys: {', '.join(sorted(unknown))}")
+
+    video = raw.get("video", {})
+    if not isinstance(video, dict) or set(video) - set(DEFAULT_VIDEO):
+        raise ValueError(f"video must be an object of {', '.join(DEFAULT_VIDEO)}")
+    video = {**DEFAULT_VIDEO, **video}
+    if not is_int(video["fps"]) or not 1 <= video["fps"] <= 60:
+        raise ValueError("video.fps must be a whole number from 1 to 60")
+    for key in ("width", "height"):
+        if not is_int(video[key]) or not 128 <= video[key] <= 1920 or video[key] % 2:
+            raise ValueError(f"video.{key} must be an even number of pixels from 128 to 1920")
+
+    characters = {}
+    for name, character in (raw.get("characters") or {}).items():
+        if not isinstance(character, dict):
+            raise ValueError(f"character {name} must be an object")
+        color = character.get("color", "#000000")
+        if not isinstance(color, str) or not COLOR_RE.match(color):
+            raise ValueError(f"character {name}: color must look like #RRGGBB")
+        pose = character.get("pose", "neutral")
+        if pose not in POSES:
+            raise ValueError(f"character {name}: unknown pose {pose} (known: {', '.join(POSES)})")
+        characters[name] = {
+            "color": color.upper(),
+            "position": point(character.get("position", [0, -0.5]), f"character {name}: position"),
+            "pose": pose,
+        }
+    if not characters:
+        raise ValueError("a screenplay needs at least one character")
+
+    beats = raw.get("beats")
+    if not isinstance(beats, list) or not beats:
+        raise ValueError("beats must be a non-empty list")
+    names = set()
+    normalized = []
+    for beat in beats:
+        name = beat.get("name") if isinstance(beat, dict) else None
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("every beat needs a name")
+        if name in names:
+            raise ValueError(f"beat names must be unique, {name} is used twice")
+        names.add(name)
+        actions = beat.get("actions")
+        if not isinstance(actions, list) or not actions:
+            raise ValueError(f"beat {name}: actions must be a non-empty list")
+        normalized.append({
+            "name": name,
+            "actions": [normalize_action(action, characters, f"beat {name}") for action in actions],
+        })
+    return {"video": video, "characters": characters, "beats": normalized, "ground": bool(raw.get("ground", True))}
+
+
+def normalize_action(action, characters, where):
+    """{"do": verb, "who": character, ...every option} from e.g. {"say": "blue", "text": "Hi"}"""
+    from stickman import POSES
+
+    verbs = [verb for verb in ACTIONS if isinstance(action, dict) and verb in action]
+    if len(verbs) != 1:
+        raise ValueError(f"{where}: every action needs exactly one of {', '.join(ACTIONS)}")
+    do = verbs[0]
+    unknown = set(action) - {do, *ACTIONS[do]}
+    if unknown:
+        raise ValueError(f"{where}: unknown {do} options: {', '.join(sorted(unknown))}")
+
+    normalized = {"do": do, **ACTIONS[do], **{key: value for key, value in action.items() if key != do}}
+    missing = [key for key, value in normalized.items() if value is None]
+    if missing:
+        raise ValueError(f"{where}: {do} needs {', '.join(missing)}")
+
+    if do == "wait":
+        normalized["seconds"] = seconds(action["wait"], f"{where}: wait")
+        return normalized
+    normalized["who"] = action[do]
+    for key in ("who", "at"):
+        if key in normalized and normalized[key] not in characters:
+            raise ValueError(f"{where}: {do} names unknown character {normalized[key]}")
+    for key in ("write", "hold", "run_time"):
+        if key in normalized:
+            normalized[key] = seconds(normalized[key], f"{where}: {do} {key}", allow_zero=key == "hold")
+    if "text" in normalized:
+        text = normalized["text"]
+        if not isinstance(text, str) or not text.strip() or len(text) > MAX_TEXT_LENGTH:
+            raise ValueError(f"{where}: {do} text must be 1 to {MAX_TEXT_LENGTH} characters")
+    if do == "pose" and normalized["to"] not in POSES:
+        raise ValueError(f"{where}: unknown pose {normalized['to']} (known: {', '.join(POSES)})")
+    if do == "move":
+        normalized["by"] = point(normalized["by"], f"{where}: move by")
+    if do == "shoot" and normalized["arrow"] not in ARROWS:
+        raise ValueError(f"{where}: arrow must be one of {', '.join(ARROWS)}")
+    for key in ("bold", "walk", "motion_lines", "impact"):
+        if key in normalized:
+            normalized[key] = bool(normalized[key])
+    return normalized
+
+
+def point(value, what):
+    if (
+        not isinstance(value, (list, tuple)) or len(value) != 2
+        or not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in value)
+    ):
+        raise ValueError(f"{what} must be [x, y]")
+    return [float(x) for x in value]
+
+
+def seconds(value, what, allow_zero=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or (value == 0 and not allow_zero):
+        raise ValueError(f"{what} must be a positive number of seconds")
+    return float(value)
+
+
+def duration(action):
+    """Seconds an action plays for, as ScreenplayScene.perform plays it"""
+    from main import ScreenplayScene
+
+    do = action["do"]
+    if do == "wait":
+        return action["seconds"]
+    if do in ("say", "think"):
+        return action["write"] + action["hold"]
+    if do == "shoot":
+        return action["run_time"] + ScreenplayScene.HIT_TIME
+    return action["run_time"]
+
+
+def compile_beats(screenplay):
+    """Beats with the cast's state at their start, their start time and duration
+
+    Only pose and move change the state. A move keeps the pose the
+    character is in, which is filled in here so the action holds all it needs.
+    """
+    state = copy.deepcopy(screenplay["characters"])
+    fps = screenplay["video"]["fps"]
+    start = 0.0
+    beats = []
+    for beat in screenplay["beats"]:
+        begin_state = copy.deepcopy(state)
+        actions = []
+        length = 0.0
+        for action in beat["actions"]:
+            action = dict(action)
+            if action["do"] == "pose":
+                state[action["who"]]["pose"] = action["to"]
+            elif action["do"] == "move":
+                action["pose"] = state[action["who"]]["pose"]
+                position = state[action["who"]]["position"]
+                state[action["who"]]["position"] = [position[0] + action["by"][0], position[1] + action["by"][1]]
+            actions.append(action)
+            length += duration(action)
+        if length * fps < 1:
+            raise ValueError(f"beat {beat['name']} must last at least one frame (1/{fps} s)")
+        beats.append({
+            "name": beat["name"],
+            "actions": actions,
+            "state": begin_state,
+            "start": start,
+            "duration": length,
+            # Where the beat falls between two frames decides which of its moments get drawn
+            "phase": round((start * fps) % 1, 6) % 1,
+        })
+        start += length
+    return beats
+
+
+def beat_keys(screenplay, beats):
+    """Key of every beat: its inputs plus everything shared (sources, libraries, encoder, size)"""
+    from main import StickmanFight
+    from render_video import ENCODER, variant_config
+
+    common, _ = artifact_cache.artifact_key({
+        "config": variant_config(screenplay["video"]),
+        "encoder": ENCODER,
+        "seed": StickmanFight.seed,
+        "ground": screenplay["ground"],
+        "compiler": artifact_cache.source_hashes(("screenplay.py",)),
+    })
+    keys = {}
+    for beat in beats:
+        inputs = {key: beat[key] for key in ("name", "actions", "state", "phase")}
+        canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+        keys[beat["name"]] = hashlib.sha256(f"{common}:{canonical}".encode()).hexdigest()[:24]
+    return keys
+
+
+def project_dir(path):
+    return os.path.join(SCREENPLAY_DIR, os.path.splitext(os.path.basename(path))[0])
+
+
+def beat_path(directory, key):
+    return os.path.join(directory, "beats", f"{key}.mp4")
+
+
+def evict_beats(directory, keys, keep=BEAT_HISTORY):
+    """Drop all but the keep most recently used beat movies outside keys
+
+    Stitching marks the beats it joins as used, so the versions dropped are
+    the ones no render has needed for longest.
+    """
+    current = {f"{key}.mp4" for key in keys.values()}
+    old = [
+        entry for entry in os.scandir(os.path.join(directory, "beats"))
+        if entry.name not in current and ".tmp" not in entry.name
+    ]
+    old.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in old[keep:]:
+        os.remove(entry.path)
+
+
+def render_beats(screenplay, beats, names):
+    """Render just these beats (the others fast-forward), return their partial movies by name"""
+    from manim import tempconfig
+    from main import ScreenplayScene
+    from render_video import ENCODER, variant_config
+    from renderer import StickmanRenderer
+
+    with tempconfig(variant_config(screenplay["video"])):
+        scene = ScreenplayScene(
+            beats,
+            ground=screenplay["ground"],
+            renderer=StickmanRenderer(defer_combine=True, encoder=ENCODER),
+            sections=names,
+            params=screenplay["video"]
+        )
+        scene.render()
+        return {
+            section.name: section.get_clean_partial_movie_files()
+            for section in scene.renderer.file_writer.sections
+            if not section.skip_animations and section.name in scene.SECTIONS
+        }
+
+
+def render_screenplay(path, output_path=None, dry_run=False):
+    """Render the screenplay in path, re-rendering only beats without a stored movie
+
+    Returns (output path, beats rendered).
+    """
+    from render_video import stitch
+
+    screenplay = normalize(load(path))
+    beats = compile_beats(screenplay)
+    keys = beat_keys(screenplay, beats)
+    directory = project_dir(path)
+    if output_path is None:
+        output_path = os.path.join(directory, f"{os.path.basename(directory)}.mp4")
+    # A beat is stale by its key alone: one changed back to an earlier version is still on disk
+    stale = [beat["name"] for beat in beats if not os.path.exists(beat_path(directory, keys[beat["name"]]))]
+    if dry_run:
+        return output_path, stale
+
+    if stale:
+        partial_movies = render_beats(screenplay, beats, stale)
+        for name in stale:
+            paths = partial_movies.get(name)
+            if not paths:
+                raise RuntimeError(f"beat {name} rendered no frames")
+            # Beats are concatenated losslessly, like sections, and kept as one movie each
+            target = beat_path(directory, keys[name])
+            tmp_path = f"{os.path.splitext(target)[0]}.tmp.mp4"
+            stitch(paths, tmp_path)
+            os.replace(tmp_path, target)
+            segment_cache.discard_merged(paths)
+        segment_cache.evict()
+
+    root, ext = os.path.splitext(output_path)
+    tmp_path = f"{root}.tmp{ext}"
+    stitch([beat_path(directory, keys[beat["name"]]) for beat in beats], tmp_path)
+    os.replace(tmp_path, output_path)
+
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump({"screenplay": os.path.abspath(path), "beats": keys}, f, indent=2)
+    evict_beats(directory, keys)
+    return output_path, stale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("screenplay", help="screenplay file, .json or .yaml")
+    parser.add_argument("--output", help=f"video path, default {SCREENPLAY_DIR}/<name>/<name>.mp4")
+    parser.add_argument("--dry-run", action="store_true", help="show what changed, render nothing")
+    args = parser.parse_args(argv)
+
+    try:
+        output_path, stale = render_screenplay(args.screenplay, args.output, args.dry_run)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.dry_run:
+        print(f"📝 Would render {len(stale)} beat(s): {', '.join(stale) or 'none'}")
+    else:
+        print(f"🎞️ Screenplay written to {output_path}, {len(stale)} beat(s) rendered")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Size-bounded store for rendered partial movies, named by content hash"""
+import os
+import time
+
+CACHE_DIR = os.environ.get("STICKMAN_CACHE_DIR", os.path.join("media", "segment_cache"))
+MAX_BYTES = int(os.environ.get("STICKMAN_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Segments touched this recently may belong to a render still running, eviction leaves them
+IN_USE_SECONDS = 300
+
+# Partial movies of merged short plays, never looked up, removed once stitched
+MERGED_PREFIX = "merged_"
+
+
+def evict(directory=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Drop the least recently used segments until the cache fits in max_bytes"""
+    if not os.path.isdir(directory):
+        return 0
+
+    segments = []
+    total = 0
+    recent = time.time() - IN_USE_SECONDS
+    for entry in os.scandir(directory):
+        # Skip ffmpeg's concat list, it is rewritten on every render
+        if not entry.is_file() or entry.name.endswith(".txt"):
+            continue
+        stat = entry.stat()
+        total += stat.st_size
+        # A concurrent render may still be encoding into (or about to rename) these:
+        # they count towards the size, but are not evicted
+        if ".tmp" in entry.name or stat.st_mtime > recent:
+            continue
+        segments.append((stat.st_atime, stat.st_size, entry.path))
+
+    removed = 0
+    for _, size, path in sorted(segments):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another render's eviction got there first
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def discard_merged(paths):
+    """Remove the merged partial movies among paths once they have been stitched"""
+    for path in paths:
+        if os.path.basename(path).startswith(MERGED_PREFIX):
+            os.remove(path)
@@ -0,0 +1,77 @@
+"""Hand-drawn wobble helpers shared by the stickman scenes"""
+import zlib
+
+import numpy as np
+
+
+def jitter(mobject, amplitude, rng):
+    """Wiggle every point of a mobject and its family in one batched draw"""
+    members = mobject.family_members_with_points()
+    if not members:
+        return mobject
+
+    sizes = [len(member.points) for member in members]
+    _shift_points(members, sizes, rng.uniform(-amplitude, amplitude, (sum(sizes), 3)))
+    return mobject
+
+
+def make_rng(seed, *labels):
+    """Generator for one named stream, e.g. a section or a single play"""
+    return np.random.default_rng([seed, *(zlib.crc32(str(label).encode()) for label in labels)])
+
+
+class Boil:
+    """Updater that re-wiggles a mobject in place, like a line redrawn every few frames
+
+        line.add_updater(Boil(0.02, seed, "underline", fps=16, every=2))
+
+    Each boil swaps the previous noise for fresh noise directly in the point
+    arrays, so nothing is allocated per frame and one updater covers a whole
+    character. The noise of boil n comes from its own stream, so it does not
+    depend on how often the updater ran (e.g. while a play was fast-forwarded).
+    """
+
+    def __init__(self, amplitude, seed, *labels, fps=16, every=2):
+        self.amplitude = amplitude
+        self.stream = (seed, *labels)
+        self.boils_per_second = fps / every
+        self.time = 0.0
+        self.boil = None
+        # Noise currently in the points, and a buffer for the next boil's
+        self.noise = None
+        self.spare = None
+
+    def __call__(self, mobject, dt):
+        self.time += dt
+        boil = int(self.time * self.boils_per_second + 1e-6)
+        if boil == self.boil:
+            return
+        self.boil = boil
+
+        members = mobject.family_members_with_points()
+        sizes = [len(member.points) for member in members]
+        shape = (sum(sizes), 3)
+        if self.noise is None or self.noise.shape != shape:
+            # First boil, or the mobject changed shape: nothing to take back
+            self.noise = np.zeros(shape)
+            self.spare = np.empty(shape)
+
+        # Fresh noise in [-amplitude, amplitude), written into the spare buffer
+        noise = make_rng(*self.stream, boil).random(out=self.spare)
+        noise *= 2
+        noise -= 1
+        noise *= self.amplitude
+
+        # Take back the last boil's wiggle while adding the new one
+        delta = self.noise
+        delta -= noise
+        delta *= -1
+        _shift_points(members, sizes, delta)
+        self.noise, self.spare = noise, delta
+
+
+def _shift_points(members, sizes, offsets):
+    start = 0
+    for member, size in zip(members, sizes):
+        member.points += offsets[start:start + size]
+        start += size
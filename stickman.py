@@ -0,0 +1,38 @@
+"""Stickman geometry shared by every scene"""
+from functools import lru_cache
+
+from manim import DOWN, LEFT, RIGHT, UP, Circle, Line, VGroup
+
+# Hand positions for each pose, relative to the stickman's position
+POSES = {
+    "ready": (LEFT * 0.6 + UP * 0.4, RIGHT * 0.8 + UP * 0.2),  # Blue fighting stance, holding weapon
+    "calm": (LEFT * 0.4 + UP * 0.3, RIGHT * 0.4 + UP * 0.3),  # Yellow relaxed
+    "selfie": (LEFT * 0.5 + DOWN * 0.1, RIGHT * 0.6 + UP * 0.1),  # Peace sign pose
+    "neutral": (LEFT * 0.5 + DOWN * 0.1, RIGHT * 0.5 + DOWN * 0.1),  # Neutral/defeated
+}
+
+SHOULDER = UP * 0.7
+HIP = DOWN * 0.3
+
+
+def pose_template(pose, color, stroke_width=6):
+    """Shared, un-wiggled stickman at the origin - copy() it before use"""
+    if pose not in POSES:
+        pose = "neutral"
+    return _build_template(pose, color, stroke_width)
+
+
+@lru_cache(maxsize=64)
+def _build_template(pose, color, stroke_width):
+    left_hand, right_hand = POSES[pose]
+    limb_width = stroke_width - 1
+
+    head = Circle(radius=0.28, color=color, stroke_width=stroke_width)
+    head.move_to(UP * 1.2)
+    body = Line(UP * 0.9, HIP, color=color, stroke_width=stroke_width)
+    left_arm = Line(SHOULDER, left_hand, color=color, stroke_width=limb_width)
+    right_arm = Line(SHOULDER, right_hand, color=color, stroke_width=limb_width)
+    left_leg = Line(HIP, LEFT * 0.3 + DOWN * 0.9, color=color, stroke_width=limb_width)
+    right_leg = Line(HIP, RIGHT * 0.3 + DOWN * 0.9, color=color, stroke_width=limb_width)
+
+    return VGroup(head, body, left_arm, right_arm, left_leg, right_leg)
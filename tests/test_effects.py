@@ -0,0 +1,60 @@
+import numpy as np
+
+from effects import EffectPool
+
+
+class Line:
+    """Just enough of a VMobject for the pool: points, style and a family"""
+
+    def __init__(self):
+        self.points = np.zeros((4, 3))
+        self.stroke_width = 4
+        self.stroke_rgbas = np.array([[1.0, 1.0, 1.0, 1.0]])
+        self.updaters = []
+
+    def get_family(self):
+        return [self]
+
+    def clear_updaters(self):
+        self.updaters = []
+
+
+def build_line(color):
+    line = Line()
+    line.stroke_rgbas[0, 0] = color
+    return line
+
+
+def test_released_effect_is_reused_as_built():
+    pool = EffectPool()
+    line = pool.acquire(build_line, 0.5)
+    line.points += 3
+    line.stroke_width = 1
+    line.stroke_rgbas[0, 3] = 0
+    line.target = Line()
+    line.updaters.append(print)
+    pool.release(line)
+
+    again = pool.acquire(build_line, 0.5)
+    assert again is line
+    np.testing.assert_array_equal(again.points, 0)
+    assert again.stroke_width == 4
+    np.testing.assert_array_equal(again.stroke_rgbas, [[0.5, 1.0, 1.0, 1.0]])
+    assert not hasattr(again, "target")
+    assert again.updaters == []
+    assert pool.stats() == {"built": 1, "reused": 1, "idle": 0}
+
+
+def test_effects_are_pooled_by_build_arguments():
+    pool = EffectPool()
+    red = pool.acquire(build_line, 1.0)
+    pool.release(red)
+    assert pool.acquire(build_line, 0.0) is not red
+    assert pool.acquire(build_line, 1.0) is red
+
+
+def test_release_ignores_strangers_and_doubles():
+    pool = EffectPool()
+    line = pool.acquire(build_line, 1.0)
+    pool.release(Line(), line, line)
+    assert pool.stats()["idle"] == 1
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+
+from frame_queue import FrameQueue
+
+
+class Pipe:
+    """ffmpeg's stdin: keeps what was written, optionally breaking after a few frames"""
+
+    def __init__(self, break_after=None, gate=None):
+        self.written = []
+        self.break_after = break_after
+        self.gate = gate
+
+    def write(self, frame):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.break_after is not None and len(self.written) >= self.break_after:
+            raise BrokenPipeError("ffmpeg exited")
+        self.written.append(bytes(frame))
+
+
+def frame(value):
+    return np.full((2, 3, 4), value, dtype=np.uint8)
+
+
+def test_frames_arrive_in_order_with_repeats():
+    pipe = Pipe()
+    frames = FrameQueue(buffers=2)
+    frames.open(pipe)
+    for value in range(5):
+        frames.put(frame(value), repeat=2 if value == 3 else 1)
+    assert frames.close() is None
+    assert pipe.written == [bytes(frame(value)) for value in (0, 1, 2, 3, 3, 4)]
+    assert not frames.is_open
+
+
+def test_put_copies_the_frame():
+    pipe = Pipe(gate=threading.Event())
+    frames = FrameQueue()
+    frames.open(pipe)
+    pixels = frame(1)
+    frames.put(pixels)
+    # The rasterizer draws the next frame into the same array straight away
+    pixels[:] = 2
+    pipe.gate.set()
+    frames.close()
+    assert pipe.written == [bytes(frame(1))]
+
+
+def test_buffers_are_reused():
+    pipe = Pipe()
+    frames = FrameQueue(buffers=2)
+    frames.open(pipe)
+    for value in range(20):
+        frames.put(frame(value))
+    frames.close()
+    assert frames.allocated <= 2
+    assert len(pipe.written) == 20
+
+
+def test_write_error_reaches_put_and_close():
+    pipe = Pipe(break_after=2)
+    frames = FrameQueue(buffers=1)
+    frames.open(pipe)
+    # Never hangs: buffers keep coming back after the pipe broke
+    with pytest.raises(BrokenPipeError):
+        for value in range(50):
+            frames.put(frame(value))
+    assert isinstance(frames.close(), BrokenPipeError)
+    assert len(pipe.written) == 2
+
+
+def test_reopened_queue_starts_clean():
+    frames = FrameQueue()
+    frames.open(Pipe(break_after=0))
+    frames.put(frame(0))
+    assert frames.close() is not None
+
+    pipe = Pipe()
+    frames.open(pipe)
+    frames.put(frame(1))
+    assert frames.close() is None
+    assert pipe.written == [bytes(frame(1))]
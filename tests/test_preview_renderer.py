@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+
+from manim import Square, VMobject, tempconfig  # noqa: E402
+
+from preview_renderer import MAX_ERROR, MAX_OFF, PreviewCamera, building_blocks, frame_difference  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def scene():
+    from main import StickmanFight
+    from render_video import RENDER_CONFIG
+    from renderer import StickmanRenderer
+
+    with tempconfig(RENDER_CONFIG):
+        scene = StickmanFight(renderer=StickmanRenderer(defer_combine=True, skip_animations=True))
+        scene.setup()
+        yield scene
+
+
+def test_preview_matches_cairo_within_tolerance(scene):
+    over = {}
+    for name, mobjects in building_blocks(scene).items():
+        error, off = frame_difference(mobjects)[:2]
+        if error > MAX_ERROR or off > MAX_OFF:
+            over[name] = (round(error, 2), round(off, 4))
+    assert not over
+
+
+def test_fill_leaves_inner_subpaths_open():
+    # A square with a square hole, like the counter of an "o"
+    ring = VMobject(stroke_width=0).set_fill("#FFFFFF", opacity=1)
+    ring.set_points(np.concatenate([Square(side_length=4).points, Square(side_length=2).points]))
+    camera = PreviewCamera()
+    camera.capture_mobjects([ring])
+
+    points = np.array([[0.0, 0.0, 0.0], [1.5, 0.0, 0.0], [3.0, 0.0, 0.0]])
+    hole, band, outside = (camera.pixel_array[y, x] for x, y in camera.pixel_coords(points).astype(int))
+    np.testing.assert_array_equal(hole, outside)
+    assert not np.array_equal(band, outside)
@@ -0,0 +1,123 @@
+import queue
+import time
+
+import pytest
+
+import render_jobs
+
+DEFAULTS = {
+    "blue_color": "#4169E1",
+    "yellow_color": "#FFA500",
+    "fps": 16,
+    "width": 720,
+    "height": 1280,
+    "dialogue": {"standoff_blue": "This ends now.", "standoff_yellow": "Agreed."},
+}
+
+
+@pytest.fixture(autouse=True)
+def scene_free(monkeypatch):
+    # The scene's defaults and the build hash come from main.py and manim; these tests need neither
+    monkeypatch.setattr(render_jobs, "default_params", lambda: DEFAULTS)
+    monkeypatch.setattr(render_jobs, "build_key", lambda: "build")
+
+
+def write_video(params, output_path):
+    """Render stand-in run in the worker process"""
+    if params["fps"] == 13:
+        raise RuntimeError("unlucky")
+    with open(output_path, "w") as f:
+        f.write(params["blue_color"])
+
+
+def wait_for(job, timeout=60):
+    deadline = time.time() + timeout
+    while job.state in ("queued", "rendering"):
+        assert time.time() < deadline, "render never finished"
+        time.sleep(0.05)
+    return job
+
+
+def test_normalize_fills_in_defaults():
+    params = render_jobs.normalize_params({"blue_color": "#abcdef", "dialogue": {"standoff_blue": "Hi."}})
+    assert params["blue_color"] == "#ABCDEF"
+    assert params["fps"] == 16
+    assert params["dialogue"] == {"standoff_blue": "Hi.", "standoff_yellow": "Agreed."}
+
+
+@pytest.mark.parametrize("raw, message", [
+    ([], "JSON object"),
+    ({"speed": 2}, "unknown parameters: speed"),
+    ({"blue_color": "blue"}, "#RRGGBB"),
+    ({"fps": True}, "fps"),
+    ({"fps": 61}, "fps"),
+    ({"width": 721}, "even number"),
+    ({"height": 64}, "even number"),
+    ({"dialogue": "Hi"}, "object of line name"),
+    ({"dialogue": {"villain": "Hi"}}, "unknown dialogue lines: villain"),
+    ({"dialogue": {"standoff_blue": " "}}, "1 to 80 characters"),
+    ({"dialogue": {"standoff_blue": "x" * 81}}, "1 to 80 characters"),
+])
+def test_normalize_rejects(raw, message):
+    with pytest.raises(ValueError, match=message):
+        render_jobs.normalize_params(raw)
+
+
+def test_params_hash_is_stable_and_covers_the_build(monkeypatch):
+    params = render_jobs.normalize_params({})
+    reordered = dict(reversed(list(params.items())))
+    assert render_jobs.params_hash(params) == render_jobs.params_hash(reordered)
+    assert render_jobs.params_hash(params) != render_jobs.params_hash({**params, "fps": 24})
+
+    before = render_jobs.params_hash(params)
+    monkeypatch.setattr(render_jobs, "build_key", lambda: "next deploy")
+    assert render_jobs.params_hash(params) != before
+
+
+def test_identical_requests_share_one_render(tmp_path):
+    jobs = render_jobs.RenderJobs(write_video, directory=str(tmp_path))
+    job = jobs.submit({"blue_color": "#123456"})
+    # Same parameters, spelled differently
+    assert jobs.submit({"blue_color": "#123456", "fps": 16}) is job
+
+    wait_for(job)
+    assert job.state == "done"
+    with open(job.path) as f:
+        assert f.read() == "#123456"
+    assert jobs.get(job.id) is job
+    assert jobs.submit({"blue_color": "#123456"}) is job
+
+
+def test_failed_render_is_retried(tmp_path):
+    jobs = render_jobs.RenderJobs(write_video, directory=str(tmp_path))
+    job = wait_for(jobs.submit({"fps": 13}))
+    assert job.state == "failed"
+    assert "unlucky" in job.error
+    assert jobs.submit({"fps": 13}) is not job
+
+
+def test_video_already_on_disk_is_done(tmp_path):
+    jobs = render_jobs.RenderJobs(write_video, directory=str(tmp_path))
+    params = render_jobs.normalize_params({})
+    (tmp_path / f"{render_jobs.params_hash(params)}.mp4").write_text("rendered earlier")
+    assert jobs.submit({}).state == "done"
+
+
+def test_history_keeps_only_the_newest_finished_jobs(tmp_path):
+    jobs = render_jobs.RenderJobs(write_video, directory=str(tmp_path), max_history=2)
+    submitted = []
+    for fps in (20, 21, 22):
+        params = render_jobs.normalize_params({"fps": fps})
+        (tmp_path / f"{render_jobs.params_hash(params)}.mp4").write_text("rendered earlier")
+        submitted.append(jobs.submit(params))
+        time.sleep(0.01)
+    assert jobs.get(submitted[0].id) is None
+    assert [jobs.get(job.id) for job in submitted[1:]] == submitted[1:]
+
+
+def test_full_queue_refuses_more(tmp_path):
+    jobs = render_jobs.RenderJobs(write_video, directory=str(tmp_path), max_queued=1)
+    # The worker thread takes one job off the queue, the next fills it
+    with pytest.raises(queue.Full):
+        for fps in range(20, 30):
+            jobs.submit({"fps": fps})
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import renditions
+
+
+def test_parse_names():
+    assert renditions.parse_names(" 480p, webm,,") == ["480p", "webm"]
+    assert renditions.parse_names("") == []
+    with pytest.raises(ValueError, match="Unknown rendition.*4k"):
+        renditions.parse_names("720p,4k")
+
+
+def test_master_size_covers_every_rendition():
+    assert renditions.master_size(["720p", "480p", "teaser_gif"]) == (720, 1280)
+    assert renditions.master_size(["480p", "1080p"]) == (1080, 1920)
+
+
+def test_rendition_path():
+    assert renditions.rendition_path("teaser_gif", "out") == os.path.join("out", "stickman_fight_teaser_gif.gif")
+
+
+@pytest.mark.parametrize("name, size, expected", [
+    ("720p", (720, 1280), True),
+    ("720p", (1080, 1920), False),
+    # Same size, but another container, frame rate or length
+    ("webm", (720, 1280), False),
+    ("720p30", (720, 1280), False),
+    ("teaser_gif", (270, 480), False),
+])
+def test_is_master_copy(name, size, expected):
+    assert renditions.is_master_copy(name, size) is expected
+
+
+def test_filter_graph_splits_the_master_once():
+    graph = renditions.filter_graph(["720p", "480p"]).split(";")
+    assert graph == [
+        "[0:v]split=2[in0][in1]",
+        "[in0]scale=720:1280:flags=lanczos[out0]",
+        "[in1]scale=480:854:flags=lanczos[out1]",
+    ]
+
+
+def test_filter_graph_trims_teasers_and_makes_gif_palettes():
+    split, chain, palette, use = renditions.filter_graph(["teaser_gif"]).split(";")
+    assert split == "[0:v]split=1[in0]"
+    assert chain == (
+        "[in0]trim=duration=4,setpts=PTS-STARTPTS,fps=10,scale=270:480:flags=lanczos,"
+        "split[gif0][palette_in0]"
+    )
+    assert palette == "[palette_in0]palettegen=stats_mode=diff[palette0]"
+    assert use == "[gif0][palette0]paletteuse=dither=bayer[out0]"
+
+
+def test_interpolated_renditions_scale_before_motion_search():
+    _, chain = renditions.filter_graph(["720p60"]).split(";")
+    scale = chain.index("scale=720:1280")
+    assert scale < chain.index("minterpolate=fps=60:mi_mode=mci") < chain.index("tmix=frames=2")
+    assert "mc_mode=aobmc" in chain
+    assert renditions.interpolate_filters(renditions.RENDITIONS["720p30"]) == [
+        "minterpolate=fps=30:mi_mode=blend"
+    ]
+
+
+def test_encode_links_the_master_without_ffmpeg(tmp_path):
+    pytest.importorskip("manim")
+    master = tmp_path / "master.mp4"
+    master.write_bytes(b"movie")
+    target = tmp_path / "out" / "video.mp4"
+    assert renditions.encode(str(master), {"720p": str(target)}, (720, 1280)) == {"720p": str(target)}
+    assert target.read_bytes() == b"movie"
+    assert os.listdir(tmp_path / "out") == ["video.mp4"]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+
+from manim import ORIGIN, RIGHT  # noqa: E402
+
+from rig import BONE, PARENTS, StickmanRig, Walk, pose_arrays, wrap_angles  # noqa: E402
+
+
+def tilted_rig():
+    rig = StickmanRig("#FFD700", ORIGIN, pose="ready", rng=np.random.default_rng(0))
+    return rig.rotate(0.3)
+
+
+def test_walk_sets_off_from_the_current_pose():
+    rig = tilted_rig()
+    angles, points = rig.angles.copy(), rig.get_all_points().copy()
+
+    walk = Walk(rig, RIGHT * 2, strides=3, base="calm")
+    walk.begin()
+    walk.interpolate(0)
+
+    np.testing.assert_allclose(wrap_angles(rig.angles - angles), 0, atol=1e-9)
+    np.testing.assert_allclose(rig.get_all_points(), points, atol=1e-9)
+
+
+def test_walk_ends_in_base_at_the_current_tilt():
+    rig = tilted_rig()
+    tilt = rig.angles[BONE["spine"]] - np.pi / 2
+    root = rig.root.copy()
+
+    walk = Walk(rig, RIGHT * 2, strides=3, base="calm")
+    walk.begin()
+    walk.interpolate(1)
+
+    angles, lengths = pose_arrays("calm")
+    angles = angles + [tilt if parent < 0 else 0 for parent in PARENTS]
+    np.testing.assert_allclose(wrap_angles(rig.angles - angles), 0, atol=1e-9)
+    np.testing.assert_allclose(rig.lengths, lengths, atol=1e-9)
+    np.testing.assert_allclose(rig.root, root + [2, 0], atol=1e-9)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+import screenplay
+
+
+def raw_screenplay(**beats):
+    return {
+        "characters": {
+            "blue": {"color": "#4169e1", "position": [-3, -0.5], "pose": "ready"},
+            "yellow": {"color": "#FFA500", "position": [3, -0.5]},
+        },
+        "beats": [{"name": name, "actions": actions} for name, actions in beats.items()],
+    }
+
+
+def test_normalize_fills_in_defaults():
+    pytest.importorskip("manim")
+    normalized = screenplay.normalize(raw_screenplay(standoff=[
+        {"say": "blue", "text": "This ends now."},
+        {"wait": 1},
+    ]))
+    assert normalized["video"] == screenplay.DEFAULT_VIDEO
+    assert normalized["ground"] is True
+    assert normalized["characters"]["blue"]["color"] == "#4169E1"
+    assert normalized["characters"]["yellow"] == {"color": "#FFA500", "position": [3.0, -0.5], "pose": "neutral"}
+    say, wait = normalized["beats"][0]["actions"]
+    assert say == {"do": "say", "who": "blue", "text": "This ends now.", "write": 0.5, "hold": 0.8, "bold": False}
+    assert wait == {"do": "wait", "seconds": 1.0}
+
+
+@pytest.mark.parametrize("beats, message", [
+    ({"a": [{"say": "red", "text": "Hi"}]}, "unknown character red"),
+    ({"a": [{"say": "blue"}]}, "say needs text"),
+    ({"a": [{"wait": 1, "pose": "blue"}]}, "exactly one of"),
+    ({"a": [{"wait": 0}]}, "positive number of seconds"),
+    ({"a": [{"pose": "blue", "to": "flying"}]}, "unknown pose flying"),
+    ({"a": [{"move": "blue", "by": [1]}]}, "must be [x, y]"),
+    ({"a": []}, "non-empty list"),
+])
+def test_normalize_rejects_bad_actions(beats, message):
+    pytest.importorskip("manim")
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        screenplay.normalize(raw_screenplay(**beats))
+
+
+def test_normalize_rejects_duplicate_beat_names():
+    pytest.importorskip("manim")
+    raw = raw_screenplay(a=[{"wait": 1}])
+    raw["beats"].append(raw["beats"][0])
+    with pytest.raises(ValueError, match="used twice"):
+        screenplay.normalize(raw)
+
+
+def test_compile_beats_carries_the_cast_state_forward():
+    pytest.importorskip("manim")
+    beats = screenplay.compile_beats(screenplay.normalize(raw_screenplay(
+        first=[{"pose": "blue", "to": "calm", "run_time": 0.5}, {"move": "blue", "by": [1, 0], "run_time": 0.3}],
+        second=[{"wait": 1}],
+    )))
+    first, second = beats
+    assert first["state"]["blue"] == {"color": "#4169E1", "position": [-3.0, -0.5], "pose": "ready"}
+    # A move holds the pose its character is in by then
+    assert first["actions"][1]["pose"] == "calm"
+    assert second["state"]["blue"] == {"color": "#4169E1", "position": [-2.0, -0.5], "pose": "calm"}
+    assert (first["start"], first["duration"]) == (0.0, 0.8)
+    assert second["start"] == 0.8
+    # 0.8 s at 16 fps is 12.8 frames: the second beat starts 0.8 of a frame in
+    assert second["phase"] == pytest.approx(0.8)
+
+
+def test_compile_beats_rejects_beats_shorter_than_a_frame():
+    pytest.importorskip("manim")
+    with pytest.raises(ValueError, match="at least one frame"):
+        screenplay.compile_beats(screenplay.normalize(raw_screenplay(blink=[{"wait": 0.01}])))
+
+
+def test_evict_beats_keeps_current_and_recent_versions(tmp_path):
+    beats = tmp_path / "beats"
+    beats.mkdir()
+    for age, name in enumerate(["current", "newer", "older", "oldest"]):
+        path = beats / f"{name}.mp4"
+        path.write_bytes(b"movie")
+        # current is the oldest file of all, and still kept
+        os.utime(path, (1000 - age * 10, 1000 - age * 10) if name != "current" else (1, 1))
+    (beats / "half.tmp.mp4").write_bytes(b"mov")
+
+    screenplay.evict_beats(str(tmp_path), {"beat": "current"}, keep=1)
+    assert sorted(os.listdir(beats)) == ["current.mp4", "half.tmp.mp4", "newer.mp4"]
@@ -0,0 +1,44 @@
+import os
+import time
+
+import segment_cache
+
+
+def make_file(directory, name, size, age):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_evict_drops_least_recently_used_until_it_fits(tmp_path):
+    make_file(tmp_path, "oldest.mp4", 100, 3000)
+    make_file(tmp_path, "older.mp4", 100, 2000)
+    make_file(tmp_path, "newest.mp4", 100, 1000)
+
+    assert segment_cache.evict(str(tmp_path), max_bytes=150) == 2
+    assert os.listdir(tmp_path) == ["newest.mp4"]
+
+
+def test_evict_leaves_tmp_and_recent_files_but_counts_them(tmp_path):
+    old = 2 * segment_cache.IN_USE_SECONDS
+    make_file(tmp_path, "old.mp4", 100, old)
+    make_file(tmp_path, "encoding.tmp.mp4", 100, old)
+    make_file(tmp_path, "just_written.mp4", 100, 1)
+    make_file(tmp_path, "concat.txt", 1000, old)
+
+    # 300 bytes of segments against a 150 byte budget: only old.mp4 may go
+    assert segment_cache.evict(str(tmp_path), max_bytes=150) == 1
+    assert sorted(os.listdir(tmp_path)) == ["concat.txt", "encoding.tmp.mp4", "just_written.mp4"]
+
+
+def test_evict_without_a_cache_dir(tmp_path):
+    assert segment_cache.evict(str(tmp_path / "missing")) == 0
+
+
+def test_discard_merged_removes_only_merged_movies(tmp_path):
+    merged = make_file(tmp_path, f"{segment_cache.MERGED_PREFIX}1.mp4", 1, 0)
+    kept = make_file(tmp_path, "abc.mp4", 1, 0)
+    segment_cache.discard_merged([str(merged), str(kept)])
+    assert os.listdir(tmp_path) == ["abc.mp4"]
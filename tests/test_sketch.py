@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+
+from manim import LEFT, RIGHT, Line  # noqa: E402
+
+from sketch import Boil  # noqa: E402
+
+AMPLITUDE = 0.02
+
+
+def test_boil_stays_within_amplitude_across_a_copy():
+    line = Line(LEFT, RIGHT)
+    base = line.points.copy()
+    line.add_updater(Boil(RIGHT * AMPLITUDE, 7, "underline", fps=16, every=2))
+    for _ in range(5):
+        line.update(1 / 16)
+
+    # The copy carries the noise in its points and its own copy of the updater's state
+    twin = line.copy()
+    for _ in range(20):
+        line.update(1 / 16)
+        twin.update(1 / 16)
+        for mobject in (line, twin):
+            offset = mobject.points - base
+            assert np.all(np.abs(offset[:, 0]) <= AMPLITUDE + 1e-9)
+            np.testing.assert_allclose(offset[:, 1:], 0, atol=1e-9)
@@ -0,0 +1,201 @@
+import email.utils
+import http.client
+import http.server
+import json
+import queue
+import threading
+from functools import partial
+
+import pytest
+
+from render_jobs import RenderJob
+from video_server import MAX_BODY_BYTES, VideoRequestHandler
+
+BODY = b"0123456789"
+
+
+class QuietHandler(VideoRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Start a server on a free port; returns a function making connections to it"""
+    (tmp_path / "video.mp4").write_bytes(BODY)
+    servers = []
+
+    def start(**handler_kwargs):
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(QuietHandler, directory=str(tmp_path), **handler_kwargs)
+        )
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return lambda: http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(connect, headers=None, path="/video.mp4", method="GET"):
+    connection = connect()
+    connection.request(method, path, headers=headers or {})
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_whole_file_with_validators(serve):
+    response, body = get(serve())
+    assert response.status == 200
+    assert body == BODY
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert response.getheader("ETag")
+    assert response.getheader("Last-Modified")
+
+
+def test_head_sends_headers_only(serve):
+    response, body = get(serve(), method="HEAD")
+    assert response.status == 200
+    assert response.getheader("Content-Length") == str(len(BODY))
+    assert body == b""
+
+
+@pytest.mark.parametrize("header, content_range, expected", [
+    ("bytes=2-5", "bytes 2-5/10", b"2345"),
+    ("bytes=7-", "bytes 7-9/10", b"789"),
+    ("bytes=8-100", "bytes 8-9/10", b"89"),
+    # Suffix ranges: the last N bytes, all of them when N is larger than the file
+    ("bytes=-3", "bytes 7-9/10", b"789"),
+    ("bytes=-30", "bytes 0-9/10", BODY),
+])
+def test_ranges(serve, header, content_range, expected):
+    response, body = get(serve(), {"Range": header})
+    assert response.status == 206
+    assert response.getheader("Content-Range") == content_range
+    assert body == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2"])
+def test_unsatisfiable_range(serve, header):
+    response, body = get(serve(), {"Range": header})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == "bytes */10"
+    assert body == b""
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,4-5", "pages=1-2", "bytes=-"])
+def test_ranges_we_do_not_serve_get_the_whole_file(serve, header):
+    response, body = get(serve(), {"Range": header})
+    assert response.status == 200
+    assert body == BODY
+
+
+def test_if_range(serve):
+    connect = serve()
+    etag = get(connect)[0].getheader("ETag")
+
+    response, body = get(connect, {"Range": "bytes=0-1", "If-Range": etag})
+    assert (response.status, body) == (206, b"01")
+    # The client's copy is of another version: it gets the whole new one
+    response, body = get(connect, {"Range": "bytes=0-1", "If-Range": '"stale"'})
+    assert (response.status, body) == (200, BODY)
+
+
+def test_not_modified(serve):
+    connect = serve()
+    first = get(connect)[0]
+
+    response, body = get(connect, {"If-None-Match": first.getheader("ETag")})
+    assert (response.status, body) == (304, b"")
+    response, body = get(connect, {"If-Modified-Since": first.getheader("Last-Modified")})
+    assert (response.status, body) == (304, b"")
+    response, body = get(connect, {"If-Modified-Since": email.utils.formatdate(0, usegmt=True)})
+    assert (response.status, body) == (200, BODY)
+
+
+def test_missing_file(serve):
+    response, _ = get(serve(), path="/nothing.mp4")
+    assert response.status == 404
+
+
+class Jobs:
+    """RenderJobs' interface to the handler, without the worker processes"""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def submit(self, params):
+        if "busy" in params:
+            raise queue.Full
+        if "bad" in params:
+            raise ValueError("unknown parameters: bad")
+        job = RenderJob("abc123", params, "media/renders/abc123.mp4", state=params.get("state", "queued"))
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+
+def post(connection, path, body, headers=None):
+    connection.request("POST", path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_render_queues_a_job_and_reports_it(serve):
+    connect = serve(jobs=Jobs())
+    response, body = post(connect(), "/render", b"{}")
+    assert response.status == 202
+    assert response.getheader("Location") == "/jobs/abc123"
+    assert json.loads(body)["state"] == "queued"
+
+    response, body = get(connect, path="/jobs/abc123")
+    assert response.status == 200
+    assert json.loads(body)["id"] == "abc123"
+    response, _ = get(connect, path="/jobs/fff")
+    assert response.status == 404
+
+
+def test_render_already_done_is_200(serve):
+    response, body = post(serve(jobs=Jobs())(), "/render", json.dumps({"state": "done"}))
+    assert response.status == 200
+    assert json.loads(body)["url"] == "/media/renders/abc123.mp4"
+
+
+@pytest.mark.parametrize("body, status", [
+    (b"{not json", 400),
+    (b'{"bad": 1}', 400),
+    (b'{"busy": 1}', 503),
+])
+def test_render_errors(serve, body, status):
+    response, _ = post(serve(jobs=Jobs())(), "/render", body)
+    assert response.status == status
+    if status == 503:
+        assert response.getheader("Retry-After") == "30"
+
+
+@pytest.mark.parametrize("jobs, path", [(None, "/render"), (Jobs(), "/elsewhere")])
+def test_not_found_post_keeps_the_connection_usable(serve, jobs, path):
+    connection = serve(jobs=jobs)()
+    response, _ = post(connection, path, b"{}")
+    assert response.status == 404
+    # The unread body used to be parsed as the next request line
+    connection.request("GET", "/video.mp4")
+    response = connection.getresponse()
+    assert (response.status, response.read()) == (200, BODY)
+
+
+def test_oversized_post_closes_the_connection(serve):
+    connection = serve(jobs=Jobs())()
+    response, _ = post(connection, "/render", b" " * (MAX_BODY_BYTES + 1))
+    assert response.status == 413
+    # The server hung up instead of reading the body as requests
+    connection.sock.settimeout(5)
+    try:
+        assert connection.sock.recv(1) == b""
+    except ConnectionResetError:
+        # Closed with the body still unread, which Linux answers with a reset
+        pass
@@ -0,0 +1,85 @@
+"""Persistent cache of shaped Text glyphs, so Pango only sees each line once"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+from manim import NORMAL, Text, VGroup, VMobject, config
+from manim import __version__ as manim_version
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT = 1
+MAX_IN_MEMORY = 256
+
+_templates = OrderedDict()
+
+
+def cached_text(text, color, font_size, font="Comic Sans MS", weight=NORMAL):
+    """Text lookalike built from cached glyph outlines"""
+    key = (text, font, font_size, weight, color)
+    template = _templates.get(key)
+    if template is None:
+        template = _load(key)
+        if template is None:
+            template = _shape(key)
+        _templates[key] = template
+        if len(_templates) > MAX_IN_MEMORY:
+            _templates.popitem(last=False)
+    else:
+        _templates.move_to_end(key)
+    return template.copy()
+
+
+def cache_dir():
+    """Where shaped glyphs are kept between runs"""
+    return os.path.join(config.media_dir, "text_cache")
+
+
+def _cache_path(key):
+    # Outlines do not depend on the color, so every palette of a line shares one file
+    text, font, font_size, weight, _ = key
+    shape_key = (text, font, font_size, weight)
+    digest = hashlib.sha256(repr((CACHE_FORMAT, manim_version, shape_key)).encode()).hexdigest()
+    return os.path.join(cache_dir(), f"{digest}.npz")
+
+
+class CachedText(VGroup):
+    """The glyphs of one cached line, kept together (preview cameras draw them as one sprite)"""
+
+
+def _glyphs(outlines, color):
+    glyphs = CachedText()
+    for points in outlines:
+        glyph = VMobject(stroke_width=0).set_points(points)
+        glyph.set_fill(color, opacity=1)
+        glyph.set_stroke(color, width=0)
+        glyphs.add(glyph)
+    return glyphs
+
+
+def _shape(key):
+    text, font, font_size, weight, color = key
+    shaped = Text(text, color=color, font_size=font_size, font=font, weight=weight)
+    outlines = [glyph.points.copy() for glyph in shaped.family_members_with_points()]
+
+    # Write atomically so a crashed render never leaves half a file behind
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **{f"g{i:05d}": points for i, points in enumerate(outlines)})
+    os.replace(tmp_path, path)
+
+    return _glyphs(outlines, color)
+
+
+def _load(key):
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as stored:
+            outlines = [stored[name] for name in sorted(stored.files)]
+    except (OSError, ValueError):
+        return None
+    return _glyphs(outlines, key[4])
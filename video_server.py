@@ -0,0 +1,270 @@
+"""Serving side of the video: render status, the render API and a file handler with ranges and validators"""
+import email.utils
+import http.server
+import json
+import os
+import queue
+import re
+import threading
+import time
+from http import HTTPStatus
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+JOB_RE = re.compile(r"^/jobs/([0-9a-f]+)$")
+
+# Render parameters are a few hundred bytes, anything much bigger is junk
+MAX_BODY_BYTES = 16 * 1024
+
+
+class RenderStatus:
+    """Progress of the background render, shared between render and server threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = "starting"
+        self.error = None
+        self.animations_done = 0
+        self.animations_total = None
+        self.frames_written = 0
+        self.frames_total = None
+        self.started = time.time()
+        self.finished = None
+        # URL of the live HLS playlist, once its first section is in
+        self.stream = None
+
+    def begin(self, animations_total, frames_total):
+        with self.lock:
+            self.state = "rendering"
+            self.animations_total = animations_total
+            self.frames_total = frames_total
+
+    def advance(self, animations, frames):
+        with self.lock:
+            self.animations_done += animations
+            self.frames_written += frames
+
+    def stream_started(self, url):
+        with self.lock:
+            self.stream = url
+
+    def finish(self):
+        with self.lock:
+            self.state = "done"
+            self.finished = time.time()
+            if self.animations_total is not None:
+                self.animations_done = self.animations_total
+
+    def fail(self, error):
+        with self.lock:
+            self.state = "failed"
+            self.error = str(error)
+            self.finished = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = (self.finished or time.time()) - self.started
+            eta = None
+            if self.state == "rendering" and self.animations_total and self.animations_done:
+                done = self.animations_done / self.animations_total
+                eta = round(elapsed / done - elapsed, 1)
+            return {
+                "state": self.state,
+                "error": self.error,
+                "animations_done": self.animations_done,
+                "animations_total": self.animations_total,
+                "frames_written": self.frames_written,
+                "frames_total": self.frames_total,
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": eta,
+                "stream": self.stream,
+            }
+
+
+class VideoRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files with Range/206, ETag/Last-Modified and 304s via socket.sendfile"""
+
+    # Keep-alive, so a seeking player reuses one connection for its range requests
+    protocol_version = "HTTP/1.1"
+
+    # Not in every system's mime.types, and players insist on them
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".ts": "video/mp2t",
+    }
+
+    def __init__(self, *args, status=None, jobs=None, **kwargs):
+        # Set before super().__init__, which already handles the request
+        self.status = status
+        self.jobs = jobs
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        route = self.path.split("?")[0]
+        if route == "/status":
+            return self.send_json(self.status.snapshot() if self.status else {"state": "unknown"})
+        match = JOB_RE.match(route)
+        if match is not None and self.jobs is not None:
+            job = self.jobs.get(match.group(1))
+            if job is None:
+                return self.send_json({"error": "no such job"}, HTTPStatus.NOT_FOUND)
+            return self.send_json(job.snapshot())
+        self.send_file(head_only=False)
+
+    def do_POST(self):
+        # Every answer below leaves the connection at the next request: the body is read
+        # first, or the connection is dropped when it cannot be
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            return self.send_json({"error": "Content-Length required"}, HTTPStatus.LENGTH_REQUIRED)
+        if not 0 <= length <= MAX_BODY_BYTES:
+            self.close_connection = True
+            return self.send_json({"error": "request too large"}, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = self.rfile.read(length)
+
+        if self.path.split("?")[0] != "/render" or self.jobs is None:
+            return self.send_json({"error": "not found"}, HTTPStatus.NOT_FOUND)
+
+        try:
+            job = self.jobs.submit(json.loads(body or b"{}"))
+        except ValueError as e:
+            # Bad JSON and bad parameters alike
+            return self.send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except queue.Full:
+            return self.send_json(
+                {"error": "render queue is full, try again shortly"},
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"}
+            )
+
+        code = HTTPStatus.OK if job.state == "done" else HTTPStatus.ACCEPTED
+        self.send_json(job.snapshot(), code, headers={"Location": f"/jobs/{job.id}"})
+
+    def do_HEAD(self):
+        self.send_file(head_only=True)
+
+    def send_file(self, head_only):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Directory redirects, index.html and listings stay with the stock handler
+            return super().do_HEAD() if head_only else super().do_GET()
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+
+            if self.not_modified(etag, stat.st_mtime):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_validators(etag, stat.st_mtime)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            byte_range = self.requested_range(size, etag, stat.st_mtime)
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if byte_range is None:
+                start, end = 0, size - 1
+                self.send_response(HTTPStatus.OK)
+            else:
+                start, end = byte_range
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+
+            length = end - start + 1
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_validators(etag, stat.st_mtime)
+            if path.endswith(".m3u8"):
+                # A live playlist grows: players must revalidate on every reload
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            if head_only or length <= 0:
+                return
+            try:
+                # Kernel-side copy (os.sendfile) straight from the page cache
+                self.connection.sendfile(f, offset=start, count=length)
+            except (BrokenPipeError, ConnectionResetError):
+                # Players drop connections all the time while seeking
+                self.close_connection = True
+
+    def send_json(self, payload, code=HTTPStatus.OK, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_validators(self, etag, mtime):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.date_time_string(mtime))
+
+    def not_modified(self, etag, mtime):
+        """Whether a conditional GET can be answered with 304"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        since = self.parse_date(self.headers.get("If-Modified-Since"))
+        return since is not None and int(mtime) <= since
+
+    def requested_range(self, size, etag, mtime):
+        """(start, end) of a satisfiable Range, None for the whole file, False for 416"""
+        header = self.headers.get("Range")
+        if header is None:
+            return None
+
+        # A stale If-Range means the client's partial copy is outdated: send it all
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range.strip() != etag:
+            since = self.parse_date(if_range)
+            if since is None or int(mtime) > since:
+                return None
+
+        # Multiple ranges are allowed to be answered with the whole file
+        match = RANGE_RE.match(header.strip())
+        if match is None:
+            return None
+        first, last = match.groups()
+        if not first:
+            if not last:
+                return None
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return False
+        return start, end
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        return int(parsed.timestamp()) if parsed is not None else None